@@ -1,5 +1,10 @@
 """Authentication utilities and endpoints for FitnessApp"""
 import os
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 from passlib.context import CryptContext
@@ -10,12 +15,19 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# argon2 is deliberately slow, so hashing runs on a small dedicated pool
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+# Verified tokens are remembered until they expire; 0 disables the cache
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
 
 # ==================== PASSWORD FUNCTIONS ====================
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
+    """Hash a password using argon2"""
     return pwd_context.hash(password)
 
 
@@ -24,6 +36,78 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+# ==================== PASSWORD HASHING POOL ====================
+class PasswordHashPoolFull(Exception):
+    """Raised when too many password hashes are already waiting for a worker"""
+
+
+class PasswordHashPool:
+    """Bounded thread pool that keeps argon2 hashing off the event loop.
+
+    At most ``max_workers`` hashes run at once and at most ``max_queue`` more
+    may wait for a worker; anything beyond that is rejected straight away so a
+    login burst cannot build an unbounded backlog.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0  # submitted and not yet finished, only touched on the event loop
+        self._running = 0  # currently executing on a worker thread
+        self.completed = 0
+        self.rejected = 0
+
+    def _call(self, func, *args):
+        with self._lock:
+            self._running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    async def run(self, func, *args):
+        """Run ``func(*args)`` on the pool, raising PasswordHashPoolFull if saturated"""
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHashPoolFull("Too many password hashes in progress")
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._call, func, *args)
+        finally:
+            self._pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        """Snapshot of pool size, queue depth and throughput counters"""
+        with self._lock:
+            running = self._running
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": running,
+            "queue_depth": max(self._pending - running, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hash_pool = PasswordHashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the password hashing pool"""
+    return await password_hash_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash on the password hashing pool"""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -36,6 +120,67 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return encoded_jwt
 
 
+# ==================== VERIFIED TOKEN CACHE ====================
+class TokenCache:
+    """LRU cache of already-verified JWTs mapped to their user id.
+
+    Entries are keyed on the raw token string and dropped once the token's
+    ``exp`` has passed, so a cached token is never accepted for longer than the
+    signature check itself would have accepted it.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, token: str) -> int | None:
+        """Return the cached user id for a token, or None on a miss"""
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        user_id, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return user_id
+
+    def put(self, token: str, user_id: int, expires_at: float | None):
+        """Remember a verified token until its expiry timestamp"""
+        if self.max_size <= 0 or expires_at is None:
+            return
+        self._entries[token] = (user_id, float(expires_at))
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Snapshot of cache size and hit/miss counters"""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
+
+
 # ==================== PYDANTIC MODELS ====================
 class SignupRequest(BaseModel):
     """Request model for user signup"""
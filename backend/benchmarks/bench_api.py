@@ -0,0 +1,313 @@
+"""Benchmark suite: throughput, tail latency and query counts of the main endpoints.
+
+Seeds a realistic dataset (``--users`` users with ``--years`` of workouts,
+training sets, daily rollups and meal plans) into a ``bench`` schema of the
+database at DATABASE_URL, then runs the app in-process on a real connection
+pool and drives each endpoint with ``--concurrency`` concurrent clients for
+``--duration`` seconds. For every endpoint it reports requests/s, p50/p95/p99
+latency, and the queries and database time per request (from the request
+metrics in db.py).
+
+    python benchmarks/bench_api.py --output baseline.json
+    python benchmarks/bench_api.py --baseline baseline.json --tolerance 0.2
+
+The schema is seeded once and reused by later runs with the same size; pass
+``--reseed`` to rebuild it. With ``--baseline`` the run is compared against an
+earlier ``--output`` file and exits with status 1 if any endpoint got slower
+(p95 or requests/s) by more than the tolerance or issues more queries.
+
+Everything runs in one process and one event loop, so the numbers are per
+worker; see loadtest.py for scaling across workers.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncpg
+from httpx import ASGITransport, AsyncClient
+
+import main
+from auth import create_access_token, hash_password
+from db import create_pool, pool_metrics
+from migrate import run_migrations
+
+SCHEMA = "bench"
+BASE_SCHEMA_SQL = Path(__file__).resolve().parents[2] / "flutter_app" / "sql" / "create_database"
+PASSWORD = "bench-password"
+EXERCISES = 60
+
+SEED_SQL = """
+INSERT INTO exercise (exer_name, exer_body_area, exer_type, exer_equip, exer_met)
+SELECT 'Exercise ' || g, (ARRAY['legs', 'chest', 'back', 'arms', 'core'])[1 + g % 5],
+       (CASE WHEN g % 6 = 0 THEN 'cardio' ELSE 'strength' END)::focus, 'Dumbbells', 3 + g % 6
+FROM generate_series(1, {exercises}) g;
+
+INSERT INTO users (user_name, user_email, user_password)
+SELECT 'bench' || g, 'bench' || g || '@bench.test', $1
+FROM generate_series(1, {users}) g;
+
+INSERT INTO body_metrics (user_id, body_weight, body_height, body_age, body_gender, body_goal)
+SELECT user_id, 60 + user_id % 40, 160 + user_id % 35, 18 + user_id % 50, 'male', 'General Fitness'
+FROM users;
+
+INSERT INTO user_fitness_profile (user_id, days_per_week_goal)
+SELECT user_id, 3 + user_id % 3 FROM users;
+
+INSERT INTO user_streak (user_id, current_streak, longest_streak, last_workout_date, week_start_date)
+SELECT user_id, user_id % 10, user_id % 40, CURRENT_DATE - 1, date_trunc('week', CURRENT_DATE)::date
+FROM users;
+
+INSERT INTO user_stats (user_id, xp, level)
+SELECT user_id, user_id * 37 % 20000, user_id * 37 % 20000 / 100 + 1 FROM users;
+
+-- Roughly three workouts a week per user
+INSERT INTO user_workout (user_id, created_at, duration_minutes, notes)
+SELECT u.user_id,
+       CURRENT_DATE - d + make_interval(secs => 25200 + u.user_id * 97 % 43200),
+       30 + (u.user_id + d) % 60, ''
+FROM users u, generate_series(1, {days}) d
+WHERE (u.user_id + d) % 7 IN (0, 2, 4);
+
+INSERT INTO user_workout_exercise (workout_id, exer_id, sets, reps, weight, notes)
+SELECT w.workout_id, 1 + (w.workout_id * 7 + k) % {exercises}, {sets}, 10, 20 + k * 5, ''
+FROM user_workout w, generate_series(1, {per_workout}) k;
+
+INSERT INTO training (user_id, workout_id, train_data, train_mins, train_reps, train_effort)
+SELECT w.user_id, w.workout_id, w.created_at, 0, 8 + s, 20 + k * 5
+FROM user_workout w, generate_series(1, {per_workout}) k, generate_series(1, {sets}) s;
+
+INSERT INTO training_exercise (train_id, exer_id, sets, reps, weight)
+SELECT train_id, 1 + train_id % {exercises}, 1 + train_id % {sets}, train_reps, train_effort
+FROM training;
+
+INSERT INTO training_body (train_id, body_id)
+SELECT t.train_id, b.body_id FROM training t JOIN body_metrics b ON b.user_id = t.user_id;
+
+INSERT INTO training_daily_rollup (
+    user_id, day, exer_id, volume_kg, max_weight_kg, total_reps,
+    total_sets, cardio_minutes, cardio_distance_km
+)
+SELECT t.user_id, t.train_data::date, te.exer_id,
+       COALESCE(SUM(te.weight * te.reps) FILTER (WHERE e.exer_type::text <> 'cardio'), 0),
+       COALESCE(MAX(te.weight) FILTER (WHERE e.exer_type::text <> 'cardio'), 0),
+       COALESCE(SUM(te.reps) FILTER (WHERE e.exer_type::text <> 'cardio'), 0),
+       COUNT(*),
+       COALESCE(SUM(t.train_mins) FILTER (WHERE e.exer_type::text = 'cardio'), 0),
+       COALESCE(SUM(t.train_effort) FILTER (WHERE e.exer_type::text = 'cardio'), 0)
+FROM training t
+JOIN training_exercise te ON te.train_id = t.train_id
+JOIN exercise e ON e.exer_id = te.exer_id
+GROUP BY 1, 2, 3;
+
+INSERT INTO user_meal_plan (user_id, plan_date, plan)
+SELECT u.user_id, CURRENT_DATE - d, '{{"breakfast": [1], "lunch": [2], "dinner": [3]}}'::jsonb
+FROM users u, generate_series(0, 29) d;
+
+CREATE TABLE bench_seed (users INT, years INT);
+INSERT INTO bench_seed VALUES ({users}, {years});
+
+ANALYZE;
+"""
+
+
+async def seed(dsn: str, users: int, years: int, reseed: bool):
+    conn = await asyncpg.connect(dsn)
+    try:
+        if not reseed and await conn.fetchval("SELECT to_regclass($1)", f"{SCHEMA}.bench_seed"):
+            seeded = await conn.fetchrow(f"SELECT users, years FROM {SCHEMA}.bench_seed")
+            if (seeded["users"], seeded["years"]) == (users, years):
+                print(f"reusing seeded schema {SCHEMA!r} ({users} users, {years} years)")
+                return
+        start = time.perf_counter()
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        await conn.execute(f"SET search_path TO {SCHEMA}")
+        await conn.execute(BASE_SCHEMA_SQL.read_text().replace("SET search_path TO public;", ""))
+        await run_migrations(conn)
+        sql = SEED_SQL.format(
+            users=users, years=years, days=years * 365, exercises=EXERCISES, per_workout=4, sets=3
+        )
+        # One password hash for everyone: login cost is the same, seeding stays fast
+        async with conn.transaction():
+            for statement in filter(str.strip, sql.split(";\n")):
+                if "$1" in statement:
+                    await conn.execute(statement, hash_password(PASSWORD))
+                else:
+                    await conn.execute(statement)
+        rows = await conn.fetchval("SELECT COUNT(*) FROM training")
+        print(f"seeded {users} users, {rows} training rows in {time.perf_counter() - start:.0f}s")
+    finally:
+        await conn.close()
+
+
+def _workout_body(rng: random.Random) -> dict:
+    return {
+        "duration_minutes": 45,
+        "exercises": [
+            {
+                "exer_id": rng.randint(1, EXERCISES),
+                "exer_name": "Exercise",
+                "sets": [{"reps": 10, "kg": 40 + 5 * s} for s in range(3)],
+            }
+            for _ in range(4)
+        ],
+    }
+
+
+# name -> (route template as recorded by db.py, request builder)
+def scenarios(users: int) -> dict:
+    today = date.today()
+
+    def user(rng):
+        return rng.randint(1, users)
+
+    @functools.lru_cache(maxsize=None)
+    def auth(user_id):
+        return {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+
+    return {
+        "login": ("POST /api/auth/login", lambda rng: (
+            "POST", "/api/auth/login", {}, {"email": f"bench{user(rng)}@bench.test", "password": PASSWORD})),
+        "save_workout": ("POST /api/workouts", lambda rng: (
+            "POST", "/api/workouts", auth(user(rng)), _workout_body(rng))),
+        "get_workouts": ("GET /api/workouts", lambda rng: (
+            "GET", "/api/workouts?limit=20", auth(user(rng)), None)),
+        "workout_volume": ("GET /api/user/workout-volume", lambda rng: (
+            "GET", "/api/user/workout-volume", auth(user(rng)), None)),
+        "exercises_progress": ("GET /api/user/exercises-progress", lambda rng: (
+            "GET", "/api/user/exercises-progress", auth(user(rng)), None)),
+        "streak": ("GET /api/streak", lambda rng: (
+            "GET", "/api/streak", auth(user(rng)), None)),
+        "get_meals": ("GET /api/meals", lambda rng: (
+            "GET", f"/api/meals?plan_date={today - timedelta(days=rng.randint(0, 29))}", auth(user(rng)), None)),
+        "save_meals": ("POST /api/meals", lambda rng: (
+            "POST", "/api/meals", auth(user(rng)),
+            {"plan_date": str(today + timedelta(days=rng.randint(1, 7))), "plan": {"breakfast": [1, 2]}})),
+    }
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+async def run_endpoint(client, route: str, build, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = 0
+    pool_metrics.reset()
+
+    async def virtual_user(seed_value):
+        nonlocal errors
+        rng = random.Random(seed_value)
+        while time.perf_counter() < deadline:
+            method, url, headers, body = build(rng)
+            start = time.perf_counter()
+            response = await client.request(method, url, headers=headers, json=body)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    route_metrics = pool_metrics.requests.get(route)
+    served = route_metrics.queries.count if route_metrics else 0
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "queries_per_request": round(route_metrics.queries.total / served, 2) if served else None,
+        "db_ms_per_request": round(route_metrics.db_time.total / served, 3) if served else None,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of ``results`` against ``baseline`` beyond the tolerance"""
+    regressions = []
+    for name, now in results["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if before is None:
+            continue
+        if now["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {now['p95_ms']}ms")
+        if now["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {before['rps']} -> {now['rps']}")
+        if (now["queries_per_request"] or 0) > (before["queries_per_request"] or 0):
+            regressions.append(
+                f"{name}: queries/request {before['queries_per_request']} -> {now['queries_per_request']}"
+            )
+    return regressions
+
+
+async def run(args) -> int:
+    dsn = os.getenv("DATABASE_URL")
+    if not dsn:
+        sys.exit("DATABASE_URL must point at a PostgreSQL database the benchmark may write to")
+    await seed(dsn, args.users, args.years, args.reseed)
+
+    # Extra DSN query parameters become server settings in asyncpg
+    main.app.state.db_pool = await create_pool(f"{dsn}{'&' if '?' in dsn else '?'}search_path={SCHEMA}")
+    main.catalog.invalidate()
+    main.leaderboards.reset()
+    selected = scenarios(args.users)
+    names = args.endpoints or list(selected)
+    results = {
+        "meta": {
+            "users": args.users,
+            "years": args.years,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "endpoints": {},
+    }
+    try:
+        async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://bench", timeout=60) as client:
+            for name in names:
+                route, build = selected[name]
+                result = await run_endpoint(client, route, build, args.concurrency, args.duration)
+                results["endpoints"][name] = result
+                print(f"{name:<20} " + " ".join(f"{key}={value}" for key, value in result.items()))
+    finally:
+        await main.app.state.db_pool.close()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"wrote {args.output}")
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--endpoints", nargs="+", choices=list(scenarios(1)))
+    parser.add_argument("--output", help="write results as JSON, e.g. to keep as a baseline")
+    parser.add_argument("--baseline", help="JSON from an earlier --output run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before failing (0.2 = 20%%)")
+    sys.exit(asyncio.run(run(parser.parse_args())))
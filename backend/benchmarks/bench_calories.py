@@ -0,0 +1,138 @@
+"""Benchmark: calories burned over a year of sessions.
+
+Seeds a ``bench_calories`` schema in the database at DATABASE_URL with
+``--users`` users, each with a year of cardio and strength sessions (via
+datagen.py). For every user it then times two ways of computing daily calories:
+
+    python - fetch every logged set and apply the MET model row by row, the
+             way CollectedData.day_cadio_calories did
+    sql    - calories.calories_burned(), one aggregate over the daily rollup
+             (per day and per week)
+
+It reports the median per user of ``--repeat`` runs and the total kcal from
+each method. The totals differ slightly because the SQL model takes the pace
+from each day's sessions, not from each set.
+
+    python benchmarks/bench_calories.py --users 20 --sessions 250 --repeat 5
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncpg
+
+from calories import (
+    LIGHT_FACTOR,
+    LIGHT_PACE,
+    STRENGTH_SET_MINUTES,
+    VIGOROUS_FACTOR,
+    VIGOROUS_PACE,
+    calories_burned,
+)
+from datagen import Volumes, generate_batch, load_batch
+from migrate import run_migrations
+
+SCHEMA = "bench_calories"
+BASE_SCHEMA_SQL = Path(__file__).resolve().parents[2] / "flutter_app" / "sql" / "create_database"
+
+SETS_SQL = """
+    SELECT t.train_data::date AS day, e.exer_type::text AS exer_type, e.exer_met,
+           t.train_mins, t.train_effort
+    FROM training t
+    JOIN training_exercise te ON te.train_id = t.train_id
+    JOIN exercise e ON e.exer_id = te.exer_id
+    WHERE t.user_id = $1
+"""
+
+
+async def seed(conn, users: int, sessions: int) -> list[int]:
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    await conn.execute(f"SET search_path TO {SCHEMA}")
+    await conn.execute(BASE_SCHEMA_SQL.read_text().replace("SET search_path TO public;", ""))
+    await run_migrations(conn)
+    exercises = [
+        (row["exer_id"], row["exer_type"])
+        for row in await conn.fetch("SELECT exer_id, exer_type::text AS exer_type FROM exercise")
+    ]
+    volumes = Volumes(users=users, workouts_per_user=sessions, sets_per_workout=12, days=365, meal_plan_days=0)
+    batch = generate_batch(random.Random(1), users, volumes, exercises, [], "x", date.today())
+    await load_batch(conn, batch)
+    await conn.execute("ANALYZE")
+    return [row["user_id"] for row in await conn.fetch("SELECT user_id FROM users ORDER BY user_id")]
+
+
+async def python_calories(conn, user_id: int) -> dict:
+    """Daily kcal computed set by set in Python"""
+    weight = await conn.fetchval(
+        "SELECT body_weight FROM body_metrics WHERE user_id = $1 ORDER BY body_id DESC LIMIT 1", user_id
+    )
+    days = defaultdict(float)
+    for row in await conn.fetch(SETS_SQL, user_id):
+        if row["exer_type"] == "cardio":
+            minutes, distance = row["train_mins"] or 0, row["train_effort"] or 0
+            factor = 1.0
+            if minutes > 0 and distance > 0:
+                pace = distance * 1000 / minutes
+                factor = LIGHT_FACTOR if pace <= LIGHT_PACE else 1.0 if pace <= VIGOROUS_PACE else VIGOROUS_FACTOR
+            met_hours = row["exer_met"] * minutes / 60 * factor
+        else:
+            met_hours = row["exer_met"] * STRENGTH_SET_MINUTES / 60
+        days[row["day"]] += met_hours * weight
+    return dict(sorted(days.items()))
+
+
+async def median_ms(run, repeat: int) -> tuple[float, object]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+async def run(args):
+    dsn = os.getenv("DATABASE_URL")
+    if not dsn:
+        sys.exit("DATABASE_URL must point at a PostgreSQL database the benchmark may write to")
+    conn = await asyncpg.connect(dsn)
+    try:
+        start = time.perf_counter()
+        user_ids = await seed(conn, args.users, args.sessions)
+        sets = await conn.fetchval("SELECT COUNT(*) FROM training")
+        print(f"seeded {len(user_ids)} users, {sets:,} sets in {time.perf_counter() - start:.1f}s")
+
+        timings = defaultdict(list)
+        totals = defaultdict(float)
+        for user_id in user_ids:
+            ms, days = await median_ms(lambda: python_calories(conn, user_id), args.repeat)
+            timings["python"].append(ms)
+            totals["python"] += sum(days.values())
+            for period in ("day", "week"):
+                ms, rows = await median_ms(lambda: calories_burned(conn, user_id, period), args.repeat)
+                timings[f"sql-{period}"].append(ms)
+                totals[f"sql-{period}"] += sum(row["total_kcal"] for row in rows)
+        for mode, values in timings.items():
+            print(f"{mode:<9} median_ms={statistics.median(values):.2f} total_kcal={totals[mode]:,.0f}")
+    finally:
+        if not args.keep:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--sessions", type=float, default=250, help="mean sessions per user over the year")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema")
+    asyncio.run(run(parser.parse_args()))
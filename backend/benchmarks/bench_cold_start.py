@@ -0,0 +1,58 @@
+"""Benchmark: startup schema work against an existing database.
+
+Compares the old behaviour, where every worker boot re-ran all of the schema
+DDL and the training backfill, with the migration runner's fast path, which
+only checks the schema version. Point DATABASE_URL at a database that is
+already migrated and holds a realistic amount of training data.
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_cold_start.py --runs 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncpg
+
+from migrate import load_migrations, run_migrations
+
+
+async def every_boot(conn):
+    for _, _, path in load_migrations():
+        await conn.execute(path.read_text())
+
+
+async def versioned(conn):
+    await run_migrations(conn)
+
+
+async def measure(conn, startup, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await startup(conn)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def run(args):
+    conn = await asyncpg.connect(os.environ["DATABASE_URL"])
+    try:
+        await run_migrations(conn)
+        rows = await conn.fetchval("SELECT COUNT(*) FROM training")
+        print(f"training rows: {rows}")
+        for name, startup in (("every-boot DDL", every_boot), ("versioned", versioned)):
+            timings = await measure(conn, startup, args.runs)
+            print(f"{name:>15}: median {statistics.median(timings):.1f} ms, max {max(timings):.1f} ms")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,84 @@
+"""Benchmark: /api/exercises/search latency on a large synthetic catalog.
+
+Copies the (migrated) exercise table definition into a throwaway
+``search_bench`` schema, fills it with ``--rows`` generated exercises and
+times the search query for a mix of whole-word, as-you-type prefix and
+misspelt queries. Needs DATABASE_URL to point at a migrated database.
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_exercise_search.py --rows 100000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncpg
+
+from main import EXERCISE_SEARCH_QUERY, _search_tsquery
+
+SCHEMA = "search_bench"
+QUERIES = ["bench press", "squ", "deadlift", "row", "curl bic", "shoulder pr", "lunge", "benhc press", "sqaut", "pul"]
+
+SEED_SQL = f"""
+CREATE TABLE {SCHEMA}.exercise (LIKE public.exercise INCLUDING ALL);
+
+INSERT INTO {SCHEMA}.exercise (exer_name, exer_body_area, exer_type, exer_descrip, exer_equip, exer_met)
+SELECT
+    initcap(mods[1 + g % array_length(mods, 1)]) || ' ' || initcap(moves[1 + (g / 7) % array_length(moves, 1)]) || ' ' || g,
+    areas[1 + g % array_length(areas, 1)],
+    types[1 + g % array_length(types, 1)],
+    'Variation ' || g || ' targeting the ' || areas[1 + g % array_length(areas, 1)]
+        || ' with a ' || moves[1 + (g / 3) % array_length(moves, 1)] || ' movement pattern',
+    equips[1 + g % array_length(equips, 1)],
+    3 + g % 8
+FROM generate_series(1, $1::int) g,
+     (SELECT ARRAY['incline', 'decline', 'seated', 'standing', 'single arm', 'paused', 'tempo', 'banded'] AS mods,
+             ARRAY['bench press', 'squat', 'deadlift', 'row', 'bicep curl', 'shoulder press', 'lunge', 'pull up',
+                   'dip', 'plank', 'sprint', 'jump rope'] AS moves,
+             ARRAY['chest', 'legs', 'back', 'arms', 'shoulders', 'core'] AS areas,
+             enum_range(NULL::focus) AS types,
+             enum_range(NULL::equip) AS equips) v;
+
+ANALYZE {SCHEMA}.exercise;
+"""
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run(args):
+    conn = await asyncpg.connect(os.environ["DATABASE_URL"])
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        await conn.execute(SEED_SQL.replace("$1::int", str(args.rows)))
+        await conn.execute(f"SET search_path TO {SCHEMA}, public")
+
+        timings = {q: [] for q in QUERIES}
+        for _ in range(args.rounds):
+            for q in QUERIES:
+                start = time.perf_counter()
+                await conn.fetch(EXERCISE_SEARCH_QUERY, _search_tsquery(q), q, 20, 0)
+                timings[q].append((time.perf_counter() - start) * 1000)
+
+        every = [t for values in timings.values() for t in values]
+        for q, values in timings.items():
+            print(f"{q!r:>16}: p50 {statistics.median(values):6.2f} ms  p95 {percentile(values, 95):6.2f} ms")
+        print(f"{'all':>16}: p50 {statistics.median(every):6.2f} ms  p95 {percentile(every, 95):6.2f} ms "
+              f"({args.rows} exercises)")
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
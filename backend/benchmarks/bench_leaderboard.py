@@ -0,0 +1,58 @@
+"""Benchmark: leaderboard operations with a large user base.
+
+Builds an in-process board for ``--users`` users with random XP and times the
+operations the API performs: a score update (XP grant), "my rank" and the
+top-N page. No database needed.
+
+    python benchmarks/bench_leaderboard.py --users 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import Leaderboard
+
+
+def timed(func, samples: list[float]):
+    start = time.perf_counter()
+    func()
+    samples.append((time.perf_counter() - start) * 1_000_000)
+
+
+def summary(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"p50 {statistics.median(ordered):8.2f} us  p99 {p99:8.2f} us"
+
+
+def run(args):
+    rng = random.Random(42)
+    board = Leaderboard()
+
+    start = time.perf_counter()
+    board.replace_all({user_id: rng.randint(0, 50_000) for user_id in range(args.users)})
+    print(f"initial load of {args.users} users: {time.perf_counter() - start:.2f} s")
+
+    updates, ranks, tops = [], [], []
+    for _ in range(args.ops):
+        user_id = rng.randrange(args.users)
+        timed(lambda: board.add(user_id, rng.randint(1, 200)), updates)
+        timed(lambda: board.rank(user_id), ranks)
+        timed(lambda: board.top(args.top), tops)
+
+    print(f"xp grant (update):  {summary(updates)}")
+    print(f"my rank:            {summary(ranks)}")
+    print(f"top {args.top:<3}:            {summary(tops)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--ops", type=int, default=20_000)
+    parser.add_argument("--top", type=int, default=10)
+    run(parser.parse_args())
@@ -0,0 +1,139 @@
+"""Benchmark: per-request cost of logging.
+
+Runs the FastAPI app in-process against a fake connection pool and posts
+``--requests`` questionnaires one after another (each logs an access record
+and a "Questionnaire saved" record), reporting the mean and p99 latency per
+request for each mode. The output stream can be made to block for
+``--write-delay-ms`` per line to mimic a stdout pipe whose reader is behind.
+
+    python benchmarks/bench_logging.py --requests 2000 --write-delay-ms 0.2
+
+Modes:
+    off    - logging not configured, records below the level are dropped
+    direct - JSON handler writing on the event loop
+    queue  - configure_logging(): JSON written by the queue listener thread
+    debug  - as queue, at DEBUG level (the questionnaire payload is logged too)
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from contextlib import asynccontextmanager
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from httpx import ASGITransport, AsyncClient
+
+import main
+from auth import create_access_token
+from logs import JsonFormatter, configure_logging
+
+PAYLOAD = {
+    "age": 30,
+    "height": 180.0,
+    "weight": 80.0,
+    "goal": "Build muscle",
+    "experience": "intermediate",
+    "location": "gym",
+    "days_per_week": 4,
+    "session_length": 60,
+    "injuries": [],
+    "diet_preference": "balanced",
+    "allergies": [],
+}
+
+
+class SlowStream:
+    """Write target that blocks for a fixed time per write, like a full pipe"""
+
+    def __init__(self, delay_ms: float):
+        self.delay = delay_ms / 1000
+        self.lines = 0
+
+    def write(self, text):
+        self.lines += 1
+        if self.delay:
+            time.sleep(self.delay)
+
+    def flush(self):
+        pass
+
+
+class FakeConnection:
+    async def fetchval(self, query, *args):
+        return 1
+
+    async def execute(self, query, *args):
+        return "UPDATE 1"
+
+
+class FakePool:
+    @asynccontextmanager
+    async def acquire(self):
+        yield FakeConnection()
+
+
+def setup_mode(mode: str, stream: SlowStream):
+    root = logging.getLogger()
+    root.handlers.clear()
+    # The benchmark's own client logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if mode == "off":
+        root.setLevel(logging.WARNING)
+        return None
+    if mode == "direct":
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(JsonFormatter())
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+        return None
+    return configure_logging("DEBUG" if mode == "debug" else "INFO", stream=stream)
+
+
+async def run_mode(mode: str, requests: int, delay_ms: float) -> dict:
+    stream = SlowStream(delay_ms)
+    listener = setup_mode(mode, stream)
+    main.app.state.db_pool = FakePool()
+    main.generated_plan = None
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': '1'})}"}
+    latencies = []
+
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://bench") as client:
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.post("/api/users/questionnaire", json=PAYLOAD, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200
+
+    drain_start = time.perf_counter()
+    if listener is not None:
+        listener.stop()
+    latencies.sort()
+    return {
+        "mode": mode,
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3),
+        "lines": stream.lines,
+        "drain_ms": round((time.perf_counter() - drain_start) * 1000, 1),
+    }
+
+
+async def run(args):
+    results = [await run_mode(mode, args.requests, args.write_delay_ms) for mode in args.modes]
+    baseline = next((r["mean_ms"] for r in results if r["mode"] == "off"), None)
+    for result in results:
+        if baseline is not None:
+            result["overhead_us"] = round((result["mean_ms"] - baseline) * 1000, 1)
+        print(" ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--write-delay-ms", type=float, default=0.0)
+    parser.add_argument("--modes", nargs="+", default=["off", "direct", "queue", "debug"],
+                        choices=["off", "direct", "queue", "debug"])
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,139 @@
+"""Benchmark: latency of unrelated endpoints during a burst of logins.
+
+Runs the FastAPI app in-process against a fake connection pool (no database
+needed) so that the only thing being measured is how much argon2 work stalls
+the event loop. Each mode fires ``--logins`` concurrent logins while a probe
+client keeps calling ``GET /api/recipes/1`` until the burst is over and
+records its latency.
+
+    python benchmarks/bench_login_concurrency.py --logins 64
+
+Modes:
+    inline - verify the password synchronously on the event loop (old behaviour)
+    pool   - verify on the bounded password hashing pool
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from contextlib import asynccontextmanager
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from httpx import ASGITransport, AsyncClient
+
+import main
+from auth import hash_password, verify_password
+
+PASSWORD = "password123"
+PROBE_INTERVAL = 0.001
+HASHED = hash_password(PASSWORD)
+
+USER_ROW = {
+    "user_id": 1,
+    "user_email": "bench@test.com",
+    "user_name": "bench",
+    "user_password": HASHED,
+}
+RECIPE_ROW = {
+    "recipe_id": 1,
+    "recipe_meal_name": "Bench Bowl",
+    "recipe_ingredients": "rice",
+    "recipe_allergy_info": "",
+    "recipe_calories": 400.0,
+    "recipe_diet_type": "Regular",
+    "recipe_instructions": "Cook",
+    "recipe_image_url": "",
+}
+
+
+class FakeConnection:
+    async def fetch(self, query, *args):
+        return [RECIPE_ROW]
+
+    async def fetchrow(self, query, *args):
+        return USER_ROW if "FROM users" in query else RECIPE_ROW
+
+
+class FakePool:
+    @asynccontextmanager
+    async def acquire(self):
+        yield FakeConnection()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_mode(mode: str, logins: int) -> dict:
+    if mode == "inline":
+        async def inline_verify(plain, hashed):
+            return verify_password(plain, hashed)
+        main.verify_password_async = inline_verify
+    else:
+        main.verify_password_async = ORIGINAL_VERIFY
+
+    main.app.state.db_pool = FakePool()
+    main.catalog.invalidate()
+    latencies = []
+
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://bench") as client:
+        burst_done = asyncio.Event()
+
+        async def probe():
+            while not burst_done.is_set():
+                # Measure from when the probe was due, so time the event loop
+                # spends blocked before the request can even start is counted.
+                start = time.perf_counter()
+                await asyncio.sleep(PROBE_INTERVAL)
+                response = await client.get("/api/recipes/1")
+                latencies.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+                assert response.status_code == 200
+
+        async def login():
+            response = await client.post(
+                "/api/auth/login",
+                json={"email": USER_ROW["user_email"], "password": PASSWORD},
+            )
+            return response.status_code
+
+        async def burst():
+            try:
+                return await asyncio.gather(*(login() for _ in range(logins)))
+            finally:
+                burst_done.set()
+
+        start = time.perf_counter()
+        _, statuses = await asyncio.gather(probe(), burst())
+        elapsed = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "logins_ok": sum(1 for s in statuses if s == 200),
+        "logins_shed": sum(1 for s in statuses if s == 503),
+        "elapsed_s": round(elapsed, 3),
+        "probes": len(latencies),
+        "probe_p50_ms": round(statistics.median(latencies), 2),
+        "probe_p99_ms": round(percentile(latencies, 99), 2),
+        "probe_max_ms": round(max(latencies), 2),
+    }
+
+
+ORIGINAL_VERIFY = main.verify_password_async
+
+
+async def run(args):
+    for mode in args.modes:
+        result = await run_mode(mode, args.logins)
+        print(" ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--modes", nargs="+", default=["inline", "pool"], choices=["inline", "pool"])
+    asyncio.run(run(parser.parse_args()))
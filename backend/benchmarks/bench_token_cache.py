@@ -0,0 +1,45 @@
+"""Benchmark: per-request cost of get_current_user_id with and without the token cache.
+
+Simulates a handful of clients polling authenticated endpoints: each call
+resolves one of ``--clients`` tokens, so after the first round every lookup
+is a cache hit.
+
+    python benchmarks/bench_token_cache.py --requests 50000 --clients 100
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from auth import TokenCache, create_access_token
+
+
+async def measure(cache: TokenCache, headers: list[str], requests: int) -> float:
+    main.token_cache = cache
+    start = time.perf_counter()
+    for i in range(requests):
+        await main.get_current_user_id(authorization=headers[i % len(headers)])
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def run(args):
+    headers = [f"Bearer {create_access_token(data={'sub': str(i)})}" for i in range(args.clients)]
+
+    uncached_us = await measure(TokenCache(max_size=0), headers, args.requests)
+    cache = TokenCache(max_size=args.clients)
+    cached_us = await measure(cache, headers, args.requests)
+
+    print(f"uncached: {uncached_us:.2f} us/request")
+    print(f"cached:   {cached_us:.2f} us/request ({uncached_us / cached_us:.1f}x faster)")
+    print(f"cache stats: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--clients", type=int, default=100)
+    asyncio.run(run(parser.parse_args()))
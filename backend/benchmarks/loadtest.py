@@ -0,0 +1,127 @@
+"""Load test: throughput of the gunicorn deployment profile per worker count.
+
+For each worker count, starts ``gunicorn -c gunicorn.conf.py main:app`` with
+WEB_CONCURRENCY set, waits until every worker reports ready, then keeps
+``--concurrency`` requests in flight against ``--path`` for ``--duration``
+seconds and reports requests/s, latency percentiles and the speed-up over the
+first worker count. Needs DATABASE_URL pointing at a migrated, seeded database.
+
+    python benchmarks/loadtest.py --workers 1 2 4 --path /api/exercises
+
+With a connection budget the pools shrink as workers are added, so the total
+stays fixed:
+
+    DB_CONNECTION_BUDGET=40 python benchmarks/loadtest.py --workers 1 2 4 8
+
+The load generator runs in this process; on small machines give it a core of
+its own (e.g. test up to cpu_count - 1 workers) or it becomes the bottleneck.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from httpx import AsyncClient
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, "WEB_CONCURRENCY": str(workers), "BIND": f"127.0.0.1:{port}"}
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(client: AsyncClient, workers: int, timeout: float = 60):
+    """Wait until enough consecutive readiness checks pass to have hit every worker"""
+    deadline = time.monotonic() + timeout
+    passed = 0
+    while passed < workers * 4:
+        if time.monotonic() > deadline:
+            raise RuntimeError("server did not become ready")
+        try:
+            response = await client.get("/health/ready")
+            ready = response.status_code == 200
+        except Exception:
+            ready = False
+        if ready:
+            passed += 1
+        else:
+            passed = 0
+            await asyncio.sleep(0.2)
+
+
+async def run_load(client: AsyncClient, path: str, headers: dict, concurrency: int, duration: float):
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def user():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def measure(args, workers: int, headers: dict) -> float:
+    server = start_server(workers, args.port)
+    try:
+        async with AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=30) as client:
+            await wait_ready(client, workers)
+            # Warm-up so connection pools and caches are filled in every worker
+            await run_load(client, args.path, headers, args.concurrency, 2)
+            latencies, errors, elapsed = await run_load(
+                client, args.path, headers, args.concurrency, args.duration
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    rps = len(latencies) / elapsed
+    print(
+        f"workers={workers:<3} requests={len(latencies):<7} errors={errors:<5} "
+        f"rps={rps:8.0f} p50={statistics.median(latencies):6.1f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99) - 1]:6.1f}ms"
+    )
+    return rps
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--path", default="/api/exercises")
+    parser.add_argument("--token", help="Bearer token for endpoints that need a user")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    results = {}
+    for workers in args.workers:
+        results[workers] = await measure(args, workers, headers)
+
+    base_workers = args.workers[0]
+    print()
+    for workers, rps in results.items():
+        speedup = rps / results[base_workers]
+        print(f"workers={workers:<3} speed-up x{speedup:4.2f} (linear x{workers / base_workers:4.2f})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
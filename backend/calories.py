@@ -0,0 +1,79 @@
+"""MET-based energy expenditure for FitnessApp.
+
+Calories burned = MET x body weight (kg) x hours. Cardio hours are the logged
+minutes. The exercise's catalogue MET is scaled by the pace of the day's
+sessions, so a slow walk burns less than a fast run on the same machine.
+Strength sets have no logged duration, so each set counts as
+STRENGTH_SET_MINUTES of work and rest at the exercise's MET.
+
+Everything is computed in SQL from ``training_daily_rollup``. A year of
+history is one aggregate over a few hundred rows, not a Python loop over
+every logged set.
+"""
+
+# Pace bands in metres per minute and the MET multiplier for each. The
+# multipliers are the ratios of the light/moderate/vigorous METs
+# (6 / 8.3 / 10) used before the catalogue had a per-exercise MET.
+LIGHT_PACE = 100  # 6 km/h
+VIGOROUS_PACE = 160  # 9.6 km/h
+LIGHT_FACTOR = 0.72
+VIGOROUS_FACTOR = 1.2
+
+# Work plus rest per strength set
+STRENGTH_SET_MINUTES = 2.0
+
+PERIODS = ("day", "week")
+
+# MET-hours of the rollup row r for exercise e (multiply by body weight for kcal).
+# Days without a distance (or minutes) count at the catalogue MET.
+CARDIO_MET_HOURS_SQL = f"""
+    e.exer_met * r.cardio_minutes / 60.0 * CASE
+        WHEN r.cardio_minutes <= 0 OR r.cardio_distance_km <= 0 THEN 1.0
+        WHEN r.cardio_distance_km * 1000 / r.cardio_minutes <= {LIGHT_PACE} THEN {LIGHT_FACTOR}
+        WHEN r.cardio_distance_km * 1000 / r.cardio_minutes <= {VIGOROUS_PACE} THEN 1.0
+        ELSE {VIGOROUS_FACTOR}
+    END
+"""
+
+STRENGTH_MET_HOURS_SQL = f"e.exer_met * r.total_sets * {STRENGTH_SET_MINUTES} / 60.0"
+
+# The user's latest body weight, for $1 = user_id
+BODY_WEIGHT_SQL = "(SELECT body_weight FROM body_metrics WHERE user_id = $1 ORDER BY body_id DESC LIMIT 1)"
+
+# $1 = user_id, $2 = 'day' or 'week', $3/$4 = inclusive date range
+CALORIES_SQL = f"""
+    SELECT
+        date_trunc($2, r.day)::date::text AS date,
+        SUM(CASE WHEN e.exer_type::text = 'cardio' THEN {CARDIO_MET_HOURS_SQL} ELSE 0 END) AS cardio,
+        SUM(CASE WHEN e.exer_type::text <> 'cardio' THEN {STRENGTH_MET_HOURS_SQL} ELSE 0 END) AS strength,
+        {BODY_WEIGHT_SQL} AS body_weight
+    FROM training_daily_rollup r
+    JOIN exercise e ON e.exer_id = r.exer_id
+    WHERE r.user_id = $1
+      AND ($3::date IS NULL OR r.day >= $3)
+      AND ($4::date IS NULL OR r.day <= $4)
+    GROUP BY 1
+    ORDER BY 1
+"""
+
+
+async def calories_burned(connection, user_id: int, period: str = "day", start=None, end=None) -> list[dict]:
+    """Cardio, strength and total kcal per day or week (dated by its Monday), oldest first.
+
+    Empty when the user has no body weight on record.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {PERIODS}")
+    result = []
+    for row in await connection.fetch(CALORIES_SQL, user_id, period, start, end):
+        if row["body_weight"] is None:
+            return []
+        cardio = float(row["cardio"] or 0) * row["body_weight"]
+        strength = float(row["strength"] or 0) * row["body_weight"]
+        result.append({
+            "date": row["date"],
+            "cardio_kcal": round(cardio, 1),
+            "strength_kcal": round(strength, 1),
+            "total_kcal": round(cardio + strength, 1),
+        })
+    return result
@@ -0,0 +1,124 @@
+"""In-process cache of the exercise and recipe catalogs.
+
+Both tables only change when the database is seeded, so each worker keeps a
+full copy in memory and answers list, filter and lookup requests from it.
+Each table carries an ETag derived from its contents; clients that send it
+back in ``If-None-Match`` get a 304 without a body.
+
+A table is reloaded when PostgreSQL sends a ``catalog_changed`` notification
+for it (see migrations/0004_catalog_notify.sql) or, as a safety net for a lost
+listener connection, once CATALOG_TTL seconds have passed.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Callable
+
+import asyncpg
+
+# Seconds before a table is reloaded even without a notification; 0 disables
+CATALOG_TTL = float(os.getenv("CATALOG_TTL", "300"))
+# max-age sent to clients; they revalidate with If-None-Match afterwards
+CATALOG_MAX_AGE = int(os.getenv("CATALOG_MAX_AGE", "300"))
+
+CATALOG_CHANNEL = "catalog_changed"
+
+
+class CatalogTable:
+    """Snapshot of one catalog table, formatted the way the API returns it"""
+
+    def __init__(self, rows: list[dict], key: str):
+        self.rows = rows
+        self.by_id = {row[key]: row for row in rows}
+        digest = hashlib.sha1(json.dumps(rows, sort_keys=True, default=str).encode()).hexdigest()
+        self.etag = f'"{digest[:20]}"'
+        self.loaded_at = time.monotonic()
+
+
+class CatalogCache:
+    """Lazily loaded, notification-invalidated copies of the catalog tables.
+
+    ``sources`` maps a table name to ``(query, key, formatter)``: the query
+    returning every row, the formatted field used for id lookups and the
+    function turning a record into its API dict.
+    """
+
+    def __init__(self, sources: dict[str, tuple[str, str, Callable]], ttl: float = CATALOG_TTL):
+        self.sources = sources
+        self.ttl = ttl
+        self._tables: dict[str, CatalogTable] = {}
+        self._locks = {name: asyncio.Lock() for name in sources}
+        self.loads = 0
+        self.invalidations = 0
+
+    def _fresh(self, name: str) -> CatalogTable | None:
+        table = self._tables.get(name)
+        if table is None or (self.ttl and time.monotonic() - table.loaded_at > self.ttl):
+            return None
+        return table
+
+    async def get(self, pool, name: str) -> CatalogTable:
+        """Return the cached table, loading it with one query if needed"""
+        table = self._fresh(name)
+        if table is not None:
+            return table
+        async with self._locks[name]:
+            # Another request may have loaded it while we waited
+            table = self._fresh(name)
+            if table is None:
+                query, key, formatter = self.sources[name]
+                async with pool.acquire() as connection:
+                    rows = await connection.fetch(query)
+                table = self._tables[name] = CatalogTable([formatter(row) for row in rows], key)
+                self.loads += 1
+            return table
+
+    async def load_all(self, pool):
+        for name in self.sources:
+            await self.get(pool, name)
+
+    def invalidate(self, name: str | None = None):
+        """Drop one table (or all of them) so the next request reloads it"""
+        if name is None:
+            self._tables.clear()
+        else:
+            self._tables.pop(name, None)
+        self.invalidations += 1
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self.invalidate(payload if payload in self.sources else None)
+
+    def _on_listener_lost(self, connection):
+        # Without notifications the TTL is the only thing keeping us fresh
+        self.invalidate()
+
+    async def listen(self, dsn: str) -> asyncpg.Connection:
+        """Open a dedicated connection that invalidates tables on NOTIFY"""
+        connection = await asyncpg.connect(dsn)
+        await connection.add_listener(CATALOG_CHANNEL, self._on_notify)
+        connection.add_termination_listener(self._on_listener_lost)
+        return connection
+
+    def stats(self) -> dict:
+        return {
+            "tables": {
+                name: {"rows": len(table.rows), "etag": table.etag}
+                for name, table in self._tables.items()
+            },
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+        }
+
+
+def cache_headers(table: CatalogTable) -> dict[str, str]:
+    return {"ETag": table.etag, "Cache-Control": f"public, max-age={CATALOG_MAX_AGE}"}
+
+
+def not_modified(if_none_match: str | None, table: CatalogTable) -> bool:
+    """True when the client's If-None-Match already names the current ETag"""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or table.etag in tags
@@ -0,0 +1,201 @@
+"""Progress chart series for FitnessApp.
+
+Every chart is a list of ``[date, value]`` points, one per training day,
+computed by a single aggregate over ``training_daily_rollup`` (one row per
+user, day and exercise, kept current when workouts are saved or deleted).
+A chart screen therefore costs one primary-key range scan per series, however
+long the user's history is.
+"""
+import asyncio
+import os
+from dataclasses import dataclass
+from datetime import date
+
+from calories import BODY_WEIGHT_SQL, CARDIO_MET_HOURS_SQL, STRENGTH_MET_HOURS_SQL
+
+# Series of one dashboard request fetched at once, each on its own pooled connection
+DASHBOARD_CONCURRENCY = int(os.getenv("DASHBOARD_CONCURRENCY", "4"))
+
+
+@dataclass(frozen=True)
+class ChartSeries:
+    """SQL aggregate for one chart, evaluated per day over the rollup"""
+
+    value: str
+    exercise_type: str | None = None
+    # Series drawn for one named exercise rather than all of them
+    per_exercise: bool = True
+    unit: str = "kg"
+
+
+SERIES = {
+    # Average pace in metres per minute
+    "cardio-speed": ChartSeries(
+        "SUM(r.cardio_distance_km) * 1000 / NULLIF(SUM(r.cardio_minutes), 0)",
+        exercise_type="cardio",
+        unit="m/min",
+    ),
+    "cardio-endurance": ChartSeries("SUM(r.cardio_minutes)", exercise_type="cardio", unit="min"),
+    "cardio-distance": ChartSeries("SUM(r.cardio_distance_km)", exercise_type="cardio", unit="km"),
+    "strength-total": ChartSeries("SUM(r.volume_kg)", exercise_type="strength"),
+    "strength-max": ChartSeries("MAX(r.max_weight_kg)", exercise_type="strength"),
+    "total-volume": ChartSeries("SUM(r.volume_kg)", per_exercise=False),
+    # kcal from the MET model in calories.py, at the user's latest body weight
+    "daily-cardio-calories": ChartSeries(
+        f"SUM({CARDIO_MET_HOURS_SQL}) * {BODY_WEIGHT_SQL}",
+        exercise_type="cardio",
+        per_exercise=False,
+        unit="kcal",
+    ),
+    "daily-calories": ChartSeries(
+        f"SUM(CASE WHEN e.exer_type::text = 'cardio' THEN {CARDIO_MET_HOURS_SQL}"
+        f" ELSE {STRENGTH_MET_HOURS_SQL} END) * {BODY_WEIGHT_SQL}",
+        per_exercise=False,
+        unit="kcal",
+    ),
+}
+
+# Dashboard chart names (as listed by /api/charts/options and used in the
+# app's hidden-chart entries) -> series; the measure is the exercise name
+DASHBOARD_CHARTS = {
+    "cardio speed": "cardio-speed",
+    "cardio enduance": "cardio-endurance",
+    "total weight lifted": "strength-total",
+    "weight personal bests": "strength-max",
+    "Progress": "strength-max",
+    "total volume": "total-volume",
+}
+
+# "track calories" measures; intake has no series yet
+CALORIE_MEASURES = {"just cardio": "daily-cardio-calories"}
+
+# $1 = user_id, $2 = exercise name (NULL for all), $3/$4 = inclusive date range
+SERIES_SQL = """
+    SELECT r.day::text AS date, {value} AS value
+    FROM training_daily_rollup r
+    JOIN exercise e ON e.exer_id = r.exer_id
+    WHERE r.user_id = $1
+      AND ($2::text IS NULL OR e.exer_name = $2)
+      AND ($3::date IS NULL OR r.day >= $3)
+      AND ($4::date IS NULL OR r.day <= $4)
+      {type_filter}
+    GROUP BY r.day
+    HAVING {value} > 0
+    ORDER BY r.day
+"""
+
+
+# Daily max weight of every exercise the user has lifted, $1-$3 as above
+PROGRESS_SQL = """
+    SELECT
+        e.exer_name,
+        r.day::text as date,
+        MAX(r.max_weight_kg) as max_kg
+    FROM training_daily_rollup r
+    JOIN exercise e ON e.exer_id = r.exer_id
+    WHERE r.user_id = $1
+      AND r.max_weight_kg > 0
+      AND ($2::date IS NULL OR r.day >= $2)
+      AND ($3::date IS NULL OR r.day <= $3)
+    GROUP BY e.exer_name, r.day
+    ORDER BY e.exer_name, r.day ASC
+"""
+
+
+def series_sql(series: ChartSeries) -> str:
+    type_filter = ""
+    if series.exercise_type == "cardio":
+        type_filter = "AND e.exer_type::text = 'cardio'"
+    elif series.exercise_type == "strength":
+        type_filter = "AND e.exer_type::text <> 'cardio'"
+    return SERIES_SQL.format(value=series.value, type_filter=type_filter)
+
+
+async def chart_series(
+    connection,
+    name: str,
+    user_id: int,
+    exercise: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> list[list]:
+    """Points of chart ``name`` for the user, oldest first"""
+    rows = await connection.fetch(series_sql(SERIES[name]), user_id, exercise, start, end)
+    return [[row["date"], round(float(row["value"]), 2)] for row in rows]
+
+
+async def exercises_progress(connection, user_id: int, start: date | None = None, end: date | None = None) -> dict:
+    """Exercise name -> daily max weight points, for every exercise in one query"""
+    result = {}
+    for row in await connection.fetch(PROGRESS_SQL, user_id, start, end):
+        result.setdefault(row["exer_name"], []).append([row["date"], float(row["max_kg"] or 0.0)])
+    return result
+
+
+def dashboard_series(chart: str, measure: str) -> tuple[str, str | None] | None:
+    """(series, exercise) drawn for a dashboard chart, or None if there is no such series"""
+    if chart == "track calories":
+        name = CALORIE_MEASURES.get(measure)
+        return (name, None) if name else None
+    name = DASHBOARD_CHARTS.get(chart)
+    if name is None:
+        return None
+    return (name, measure) if SERIES[name].per_exercise else (name, None)
+
+
+async def dashboard(
+    pool,
+    user_id: int,
+    charts: list[tuple[str, str]],
+    start: date | None = None,
+    end: date | None = None,
+    progress: bool = False,
+) -> list[dict]:
+    """Every requested (chart, measure) the user hasn't hidden, with its points.
+
+    The hidden list is read first so hidden charts cost nothing; the series
+    are then fetched concurrently, up to DASHBOARD_CONCURRENCY connections at a
+    time. Charts without a series are returned with ``points`` set to None.
+    With ``progress``, a "Progress" chart for every exercise the user has
+    lifted is appended, all from one query.
+    """
+    async with pool.acquire() as connection:
+        hidden = {
+            (row["chart_name"].strip(), row["option"].strip())
+            for row in await connection.fetch(
+                "SELECT chart_name, option FROM user_hidden_charts WHERE user_id = $1",
+                user_id,
+            )
+        }
+    wanted = [
+        pair for pair in dict.fromkeys((chart.strip(), measure.strip()) for chart, measure in charts)
+        if pair not in hidden
+    ]
+    slots = asyncio.Semaphore(DASHBOARD_CONCURRENCY)
+
+    async def fetch(chart: str, measure: str) -> dict:
+        entry = {"chart": chart, "measure": measure, "series": None, "unit": None, "points": None}
+        target = dashboard_series(chart, measure)
+        if target is None:
+            return entry
+        name, exercise = target
+        entry.update(series=name, unit=SERIES[name].unit)
+        async with slots, pool.acquire() as connection:
+            entry["points"] = await chart_series(connection, name, user_id, exercise, start, end)
+        return entry
+
+    async def fetch_progress() -> list[dict]:
+        if not progress:
+            return []
+        async with slots, pool.acquire() as connection:
+            by_exercise = await exercises_progress(connection, user_id, start, end)
+        return [
+            {"chart": "Progress", "measure": exercise, "series": "strength-max", "unit": "kg", "points": points}
+            for exercise, points in by_exercise.items()
+            if ("Progress", exercise) not in hidden and ("Progress", exercise) not in wanted
+        ]
+
+    *entries, progress_entries = await asyncio.gather(
+        *(fetch(chart, measure) for chart, measure in wanted), fetch_progress()
+    )
+    return entries + progress_entries
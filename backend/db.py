@@ -0,0 +1,380 @@
+"""Database connection pool setup and instrumentation for FitnessApp.
+
+The asyncpg pool is sized and tuned from environment variables and wrapped in
+an InstrumentedPool that records how long requests wait for a connection. A
+query logger attached to every pooled connection records statement latency
+per API route, and RequestRouteMiddleware records each request's latency,
+query count and time spent in queries, so /api/metrics (JSON) and /metrics
+(Prometheus) show which routes are slow, where database time goes, whether a
+route has started issuing a query per row, and whether the pool is too small
+for the worker count.
+"""
+import asyncio
+import bisect
+import contextvars
+import os
+import time
+from contextlib import asynccontextmanager
+
+import asyncpg
+from fastapi import HTTPException
+
+# ==================== CONFIGURATION ====================
+def _pool_max_size() -> int:
+    """Per-worker pool size: DB_POOL_MAX_SIZE, else a share of DB_CONNECTION_BUDGET.
+
+    The budget is the total number of connections all WEB_CONCURRENCY workers
+    together may open; each worker also holds one catalog listener connection.
+    """
+    if os.getenv("DB_POOL_MAX_SIZE"):
+        return int(os.environ["DB_POOL_MAX_SIZE"])
+    if os.getenv("DB_CONNECTION_BUDGET"):
+        workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+        return max(1, int(os.environ["DB_CONNECTION_BUDGET"]) // workers - 1)
+    return 5
+
+
+DB_POOL_MAX_SIZE = _pool_max_size()
+DB_POOL_MIN_SIZE = min(int(os.getenv("DB_POOL_MIN_SIZE", "1")), DB_POOL_MAX_SIZE)
+# Seconds an idle connection is kept before being closed; 0 keeps them forever
+DB_POOL_MAX_INACTIVE_LIFETIME = float(os.getenv("DB_POOL_MAX_INACTIVE_LIFETIME", "300"))
+# Prepared statements cached per connection; 0 disables (needed behind pgbouncer)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+# Seconds a request may wait for a free connection before giving up
+DB_ACQUIRE_TIMEOUT = float(os.getenv("DB_ACQUIRE_TIMEOUT", "10"))
+
+# Bucket upper bounds in milliseconds, shared by every latency histogram
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# Bucket upper bounds for the number of queries one request issues
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+# ==================== METRICS ====================
+class Histogram:
+    """Fixed-bucket histogram, of latencies in milliseconds by default"""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms: float):
+        self.counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    def percentile(self, pct: float) -> float | None:
+        """Upper bound of the bucket holding the given percentile"""
+        if not self.count:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_ms": round(self.total, 3),
+            "max_ms": round(self.max, 3),
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "buckets": {
+                **{str(bound): count for bound, count in zip(self.buckets, self.counts)},
+                "+Inf": self.counts[-1],
+            },
+        }
+
+
+class RequestStats:
+    """Queries issued while serving one request"""
+
+    __slots__ = ("queries", "db_ms")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+
+
+class RouteMetrics:
+    """Latency, query count and database time of the requests to one route"""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_time = Histogram()
+        self.statuses: dict[int, int] = {}
+
+    def snapshot(self) -> dict:
+        return {
+            "latency": self.latency.snapshot(),
+            "queries": self.queries.snapshot(),
+            "db_time": self.db_time.snapshot(),
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+        }
+
+
+class PoolMetrics:
+    """Acquire wait times, per-route query latency and per-route request metrics"""
+
+    def __init__(self):
+        self.acquire_wait = Histogram()
+        self.acquire_timeouts = 0
+        self.waiting = 0
+        self.queries: dict[str, Histogram] = {}
+        self.query_errors = 0
+        self.requests: dict[str, RouteMetrics] = {}
+
+    def observe_query(self, route: str, elapsed_ms: float, failed: bool = False):
+        histogram = self.queries.get(route)
+        if histogram is None:
+            histogram = self.queries[route] = Histogram()
+        histogram.observe(elapsed_ms)
+        if failed:
+            self.query_errors += 1
+
+    def observe_request(self, route: str, status: int, elapsed_ms: float, stats: RequestStats):
+        metrics = self.requests.get(route)
+        if metrics is None:
+            metrics = self.requests[route] = RouteMetrics()
+        metrics.latency.observe(elapsed_ms)
+        metrics.queries.observe(stats.queries)
+        metrics.db_time.observe(stats.db_ms)
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def reset(self):
+        self.__init__()
+
+
+pool_metrics = PoolMetrics()
+
+# Route template of the request being served, e.g. "GET /api/workouts/{workout_id}"
+_current_scope: contextvars.ContextVar[dict | None] = contextvars.ContextVar("db_request_scope", default=None)
+_request_stats: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar("db_request_stats", default=None)
+
+
+def current_route() -> str:
+    """Route template for the current request, or "background" outside one"""
+    scope = _current_scope.get()
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    path = getattr(route, "path", None) or "unmatched"
+    return f"{scope.get('method', '')} {path}"
+
+
+class RequestRouteMiddleware:
+    """ASGI middleware exposing the request to the query logger and timing it.
+
+    The router fills in ``scope["route"]`` once it has matched, so the scope
+    is stored rather than the path; that keeps metrics keyed on the route
+    template instead of on every distinct id in the URL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        scope_token = _current_scope.set(scope)
+        stats = RequestStats()
+        stats_token = _request_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            # asyncpg runs query loggers via call_soon; let the last ones land
+            await asyncio.sleep(0)
+            pool_metrics.observe_request(current_route(), status, elapsed_ms, stats)
+            _request_stats.reset(stats_token)
+            _current_scope.reset(scope_token)
+
+
+def _log_query(record):
+    elapsed_ms = record.elapsed * 1000
+    pool_metrics.observe_query(current_route(), elapsed_ms, failed=record.exception is not None)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_ms += elapsed_ms
+
+
+async def _init_connection(connection):
+    connection.add_query_logger(_log_query)
+
+
+# ==================== POOL ====================
+class PoolAcquireTimeout(HTTPException):
+    """No connection became free within DB_ACQUIRE_TIMEOUT"""
+
+    def __init__(self):
+        super().__init__(
+            status_code=503,
+            detail="Database busy, please try again",
+            headers={"Retry-After": "1"},
+        )
+
+
+class InstrumentedPool:
+    """asyncpg pool wrapper that times and bounds ``acquire()``"""
+
+    def __init__(self, pool: asyncpg.Pool, acquire_timeout: float = DB_ACQUIRE_TIMEOUT,
+                 metrics: PoolMetrics = pool_metrics):
+        self._pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.metrics = metrics
+
+    @asynccontextmanager
+    async def acquire(self):
+        start = time.perf_counter()
+        self.metrics.waiting += 1
+        try:
+            connection = await self._pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.metrics.acquire_timeouts += 1
+            raise PoolAcquireTimeout()
+        finally:
+            self.metrics.waiting -= 1
+            self.metrics.acquire_wait.observe((time.perf_counter() - start) * 1000)
+        try:
+            yield connection
+        finally:
+            await self._pool.release(connection)
+
+    async def close(self):
+        await self._pool.close()
+
+    def stats(self) -> dict:
+        size = self._pool.get_size()
+        idle = self._pool.get_idle_size()
+        return {
+            "min_size": self._pool.get_min_size(),
+            "max_size": self._pool.get_max_size(),
+            "size": size,
+            "in_use": size - idle,
+            "idle": idle,
+            "waiting": self.metrics.waiting,
+            "acquire_timeouts": self.metrics.acquire_timeouts,
+            "acquire_wait": self.metrics.acquire_wait.snapshot(),
+        }
+
+
+async def create_pool(dsn: str) -> InstrumentedPool:
+    """Create the application pool from the DB_* settings"""
+    pool = await asyncpg.create_pool(
+        dsn,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        max_inactive_connection_lifetime=DB_POOL_MAX_INACTIVE_LIFETIME,
+        statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+        init=_init_connection,
+    )
+    return InstrumentedPool(pool)
+
+
+def metrics_snapshot(pool) -> dict:
+    """Pool and query metrics for /api/metrics"""
+    return {
+        "pool": pool.stats() if isinstance(pool, InstrumentedPool) else None,
+        "queries": {route: h.snapshot() for route, h in sorted(pool_metrics.queries.items())},
+        "query_errors": pool_metrics.query_errors,
+        "requests": {route: m.snapshot() for route, m in sorted(pool_metrics.requests.items())},
+    }
+
+
+# ==================== PROMETHEUS ====================
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{key}="{_label_value(value)}"' for key, value in labels.items()) + "}"
+
+
+def _route_labels(route: str) -> dict:
+    method, _, path = route.partition(" ")
+    return {"method": method, "route": path} if path else {"method": "", "route": route}
+
+
+class _Exposition:
+    """Builds the Prometheus text format, one metric family at a time"""
+
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def family(self, name: str, kind: str, help_text: str):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value, **labels):
+        self.lines.append(f"{name}{_labels(**labels) if labels else ''} {value}")
+
+    def histogram(self, name: str, histogram: Histogram, scale: float = 1.0, **labels):
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            self.sample(f"{name}_bucket", cumulative, **labels, le=f"{bound * scale:g}")
+        self.sample(f"{name}_bucket", histogram.count, **labels, le="+Inf")
+        self.sample(f"{name}_sum", f"{histogram.total * scale:.6f}", **labels)
+        self.sample(f"{name}_count", histogram.count, **labels)
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def prometheus_metrics(pool) -> str:
+    """Request, query and pool metrics of this worker in the Prometheus text format"""
+    out = _Exposition()
+    requests = sorted(pool_metrics.requests.items())
+
+    out.family("fitnessapp_http_requests_total", "counter", "Requests served, by route and status")
+    for route, metrics in requests:
+        for status, count in sorted(metrics.statuses.items()):
+            out.sample("fitnessapp_http_requests_total", count, **_route_labels(route), status=status)
+
+    out.family("fitnessapp_http_request_duration_seconds", "histogram", "Request latency")
+    for route, metrics in requests:
+        out.histogram("fitnessapp_http_request_duration_seconds", metrics.latency, 0.001, **_route_labels(route))
+
+    out.family("fitnessapp_db_queries_per_request", "histogram", "Queries issued while serving one request")
+    for route, metrics in requests:
+        out.histogram("fitnessapp_db_queries_per_request", metrics.queries, **_route_labels(route))
+
+    out.family("fitnessapp_db_time_per_request_seconds", "histogram", "Time one request spent in queries")
+    for route, metrics in requests:
+        out.histogram("fitnessapp_db_time_per_request_seconds", metrics.db_time, 0.001, **_route_labels(route))
+
+    out.family("fitnessapp_db_query_duration_seconds", "histogram", "Latency of single queries, by route")
+    for route, histogram in sorted(pool_metrics.queries.items()):
+        out.histogram("fitnessapp_db_query_duration_seconds", histogram, 0.001, **_route_labels(route))
+
+    out.family("fitnessapp_db_query_errors_total", "counter", "Queries that raised an error")
+    out.sample("fitnessapp_db_query_errors_total", pool_metrics.query_errors)
+
+    out.family("fitnessapp_db_pool_acquire_wait_seconds", "histogram", "Time spent waiting for a pooled connection")
+    out.histogram("fitnessapp_db_pool_acquire_wait_seconds", pool_metrics.acquire_wait, 0.001)
+    out.family("fitnessapp_db_pool_acquire_timeouts_total", "counter", "Requests that gave up waiting for a connection")
+    out.sample("fitnessapp_db_pool_acquire_timeouts_total", pool_metrics.acquire_timeouts)
+
+    if isinstance(pool, InstrumentedPool):
+        stats = pool.stats()
+        for key in ("size", "in_use", "idle", "waiting", "max_size"):
+            out.family(f"fitnessapp_db_pool_{key}", "gauge", f"Connection pool {key.replace('_', ' ')}")
+            out.sample(f"fitnessapp_db_pool_{key}", stats[key])
+    return out.render()
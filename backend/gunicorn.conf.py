@@ -0,0 +1,29 @@
+"""Production server settings: gunicorn managing uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+WEB_CONCURRENCY sets the worker count (default: one per CPU core). Set
+DB_CONNECTION_BUDGET to the number of PostgreSQL connections this deployment
+may use in total and each worker sizes its pool to its share of it.
+"""
+import multiprocessing
+import os
+
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+# db.py reads this at import time to split DB_CONNECTION_BUDGET between workers
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = os.getenv("BIND", "0.0.0.0:5001")
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = True
+
+# Workers that stop responding are restarted; shutdown lets requests finish
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# Requests are logged as JSON by the app itself (see logs.py)
+accesslog = None
+errorlog = "-"
@@ -0,0 +1,333 @@
+"""In-process leaderboards for FitnessApp.
+
+Each worker keeps every board as a sorted (chunked) list of
+``(-score, user_id)`` plus a score lookup, so "top N" is a slice and "my rank"
+is a binary search instead of an ORDER BY over every user per request.
+
+Boards are loaded once, then kept current two ways: writes handled by this
+worker (XP grants, streak updates) are applied immediately, and a background
+task re-reads scores for users changed in the database since the last pass,
+which picks up writes made by other workers. Re-read scores are absolute, so
+the overlap between passes is harmless.
+"""
+import asyncio
+import logging
+import os
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+
+# Seconds between incremental refreshes from the database
+LEADERBOARD_REFRESH_INTERVAL = float(os.getenv("LEADERBOARD_REFRESH_INTERVAL", "5"))
+# Each refresh re-reads changes from this far before the previous one, to catch
+# transactions that committed after it ran but were timestamped before it
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+BOARDS = ("xp", "weekly-xp", "streak")
+
+logger = logging.getLogger(__name__)
+
+
+class SortedKeys:
+    """Sorted list stored as a list of chunks.
+
+    Inserting into or deleting from one flat list of a million entries shifts
+    the whole tail; with chunks of ~CHUNK entries only one chunk moves, and
+    positions are found by bisecting the chunk maxima. A Fenwick tree over the
+    chunk lengths gives the number of keys before a chunk in O(log chunks), so
+    ``index`` stays logarithmic however many chunks there are.
+    """
+
+    CHUNK = 1000
+
+    def __init__(self, keys=()):
+        ordered = sorted(keys)
+        self._chunks = [ordered[i:i + self.CHUNK] for i in range(0, len(ordered), self.CHUNK)]
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+        self._len = len(ordered)
+        self._rebuild_counts()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key):
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            self._rebuild_counts()
+        else:
+            i = min(bisect_left(self._maxes, key), len(self._chunks) - 1)
+            chunk = self._chunks[i]
+            insort(chunk, key)
+            self._maxes[i] = chunk[-1]
+            if len(chunk) > 2 * self.CHUNK:
+                self._chunks[i:i + 1] = [chunk[:self.CHUNK], chunk[self.CHUNK:]]
+                self._maxes[i:i + 1] = [chunk[self.CHUNK - 1], chunk[-1]]
+                self._rebuild_counts()
+            else:
+                self._bump(i, 1)
+        self._len += 1
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        chunk = self._chunks[i]
+        del chunk[bisect_left(chunk, key)]
+        if chunk:
+            self._maxes[i] = chunk[-1]
+            self._bump(i, -1)
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+            self._rebuild_counts()
+        self._len -= 1
+
+    def index(self, key) -> int:
+        """Number of stored keys that sort before ``key``"""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._chunks):
+            return self._len
+        return self._count_before(i) + bisect_left(self._chunks[i], key)
+
+    def _rebuild_counts(self):
+        """Fenwick tree of chunk lengths, built in O(chunks) after a split or merge"""
+        tree = [0] + [len(chunk) for chunk in self._chunks]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._counts = tree
+
+    def _bump(self, chunk: int, delta: int):
+        i = chunk + 1
+        while i < len(self._counts):
+            self._counts[i] += delta
+            i += i & -i
+
+    def _count_before(self, chunk: int) -> int:
+        """Keys stored in chunks ``0 .. chunk - 1``"""
+        total = 0
+        while chunk > 0:
+            total += self._counts[chunk]
+            chunk -= chunk & -chunk
+        return total
+
+    def head(self, n: int) -> list:
+        result = []
+        for chunk in self._chunks:
+            if len(result) >= n:
+                break
+            result.extend(chunk[:n - len(result)])
+        return result
+
+
+class Leaderboard:
+    """Scores kept sorted for O(log n) rank lookups.
+
+    Equal scores share a rank (1, 2, 2, 4, ...), ties broken by user id.
+    """
+
+    def __init__(self):
+        self._keys = SortedKeys()  # (-score, user_id), ascending
+        self._scores: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def replace_all(self, scores: dict[int, int]):
+        self._scores = dict(scores)
+        self._keys = SortedKeys((-score, user_id) for user_id, score in self._scores.items())
+
+    def set(self, user_id: int, score: int):
+        old = self._scores.get(user_id)
+        if old == score:
+            return
+        if old is not None:
+            self._keys.remove((-old, user_id))
+        self._keys.add((-score, user_id))
+        self._scores[user_id] = score
+
+    def add(self, user_id: int, amount: int):
+        self.set(user_id, self._scores.get(user_id, 0) + amount)
+
+    def discard(self, user_id: int):
+        """Remove the user from the board, if present"""
+        old = self._scores.pop(user_id, None)
+        if old is not None:
+            self._keys.remove((-old, user_id))
+
+    def score(self, user_id: int) -> int | None:
+        return self._scores.get(user_id)
+
+    def rank(self, user_id: int) -> int | None:
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        # Everyone with a strictly higher score sorts before (-score,)
+        return self._keys.index((-score,)) + 1
+
+    def top(self, n: int) -> list[tuple[int, int, int]]:
+        """(rank, user_id, score) for the first n entries"""
+        entries = []
+        for index, (neg_score, user_id) in enumerate(self._keys.head(n)):
+            if entries and entries[-1][2] == -neg_score:
+                rank = entries[-1][0]
+            else:
+                rank = index + 1
+            entries.append((rank, user_id, -neg_score))
+        return entries
+
+
+def week_start(day: date) -> date:
+    """Monday of the week containing ``day``"""
+    return day - timedelta(days=day.weekday())
+
+
+# Total XP = compacted user_stats.xp + pending ledger events
+LOAD_XP_SQL = """
+    SELECT COALESCE(s.user_id, p.user_id) AS user_id,
+           COALESCE(s.xp, 0) + COALESCE(p.pending, 0) AS score
+    FROM user_stats s
+    FULL JOIN (
+        SELECT user_id, SUM(amount) AS pending FROM xp_event WHERE NOT compacted GROUP BY user_id
+    ) p ON p.user_id = s.user_id
+"""
+
+LOAD_WEEKLY_SQL = """
+    SELECT user_id, SUM(amount) AS score
+    FROM xp_event
+    WHERE created_at >= $1 AND source <> 'opening_balance'
+    GROUP BY user_id
+"""
+
+LOAD_STREAK_SQL = """
+    SELECT user_id, longest_streak AS score FROM user_streak WHERE longest_streak > 0
+"""
+
+# Users whose XP or streak changed since $1
+CHANGED_USERS_SQL = """
+    SELECT user_id FROM xp_event WHERE created_at > $1
+    UNION
+    SELECT user_id FROM user_stats WHERE updated_at > $1
+    UNION
+    SELECT user_id FROM user_streak WHERE updated_at > $1
+"""
+
+# Absolute scores on every board for $1 = user ids, $2 = start of this week
+USER_SCORES_SQL = """
+    SELECT u.user_id,
+           COALESCE(s.xp, 0) + COALESCE(p.pending, 0) AS xp,
+           COALESCE(w.weekly, 0) AS weekly_xp,
+           COALESCE(st.longest_streak, 0) AS streak
+    FROM unnest($1::int[]) AS u(user_id)
+    LEFT JOIN user_stats s ON s.user_id = u.user_id
+    LEFT JOIN user_streak st ON st.user_id = u.user_id
+    LEFT JOIN LATERAL (
+        SELECT SUM(amount) AS pending FROM xp_event
+        WHERE user_id = u.user_id AND NOT compacted
+    ) p ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT SUM(amount) AS weekly FROM xp_event
+        WHERE user_id = u.user_id AND created_at >= $2 AND source <> 'opening_balance'
+    ) w ON TRUE
+"""
+
+
+class LeaderboardService:
+    """The set of boards for one worker, plus their database sync state"""
+
+    def __init__(self):
+        self.boards = {name: Leaderboard() for name in BOARDS}
+        self.loaded = False
+        self.synced_at = None  # database clock at the start of the last sync
+        self.week_start = None
+        self._lock = asyncio.Lock()
+
+    def reset(self):
+        self.__init__()
+
+    async def ensure_loaded(self, pool):
+        if self.loaded:
+            return
+        async with self._lock:
+            if not self.loaded:
+                async with pool.acquire() as connection:
+                    await self.load(connection)
+
+    async def load(self, connection):
+        """Full load of every board"""
+        now = await connection.fetchval("SELECT LOCALTIMESTAMP")
+        self.week_start = week_start(now.date())
+        for name, query, args in (
+            ("xp", LOAD_XP_SQL, ()),
+            ("weekly-xp", LOAD_WEEKLY_SQL, (self.week_start,)),
+            ("streak", LOAD_STREAK_SQL, ()),
+        ):
+            rows = await connection.fetch(query, *args)
+            # Users without a score are not on a board, as in _apply
+            self.boards[name].replace_all({row["user_id"]: int(row["score"]) for row in rows if row["score"]})
+        self.synced_at = now
+        self.loaded = True
+
+    async def refresh(self, connection) -> int:
+        """Re-read the scores of users changed since the last sync; returns how many"""
+        now = await connection.fetchval("SELECT LOCALTIMESTAMP")
+        if week_start(now.date()) != self.week_start:
+            # New week: weekly XP starts from zero for everyone
+            await self.load(connection)
+            return len(self.boards["xp"])
+
+        changed = [row["user_id"] for row in await connection.fetch(
+            CHANGED_USERS_SQL, self.synced_at - REFRESH_OVERLAP
+        )]
+        if changed:
+            rows = await connection.fetch(USER_SCORES_SQL, changed, self.week_start)
+            for row in rows:
+                self._apply(row["user_id"], "xp", row["xp"])
+                self._apply(row["user_id"], "weekly-xp", row["weekly_xp"])
+                self._apply(row["user_id"], "streak", row["streak"])
+        self.synced_at = now
+        return len(changed)
+
+    def _apply(self, user_id: int, board: str, score):
+        if score:
+            self.boards[board].set(user_id, int(score))
+        else:
+            self.boards[board].discard(user_id)
+
+    def record_xp(self, user_id: int, total_xp: int, granted: int):
+        """Apply an XP grant handled by this worker"""
+        if not self.loaded:
+            return
+        self.boards["xp"].set(user_id, total_xp)
+        self.boards["weekly-xp"].add(user_id, granted)
+
+    def record_streak(self, user_id: int, streak):
+        """Apply a streak update handled by this worker (``streak`` may be None)"""
+        if self.loaded and streak is not None:
+            self.boards["streak"].set(user_id, streak["longest_streak"])
+
+    def standings(self, board: str, user_id: int, limit: int) -> dict:
+        entries = self.boards[board]
+        return {
+            "top": [
+                {"rank": rank, "user_id": uid, "score": score}
+                for rank, uid, score in entries.top(limit)
+            ],
+            "me": {"rank": entries.rank(user_id), "score": entries.score(user_id) or 0},
+            "total_users": len(entries),
+        }
+
+
+async def run_refresher(service: LeaderboardService, pool, interval: float = LEADERBOARD_REFRESH_INTERVAL):
+    """Background task: keep the boards in sync with writes from other workers"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with pool.acquire() as connection:
+                if service.loaded:
+                    await service.refresh(connection)
+                else:
+                    await service.load(connection)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Leaderboard refresh failed")
@@ -0,0 +1,137 @@
+"""Structured logging for FitnessApp.
+
+Records are written as one JSON object per line, tagged with the id of the
+request that produced them. Handlers on the event loop only put records on a
+queue; a QueueListener thread formats and writes them, so a slow stdout
+(a full pipe, a busy log collector) never blocks request handling.
+
+Each request gets an id from its ``X-Request-ID`` header (or a fresh one),
+echoed back in the response and attached to every record logged while it is
+being served, plus one access record when it completes.
+"""
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# One "request" record per request; disable when a proxy already logs access
+ACCESS_LOG = os.getenv("ACCESS_LOG", "1") != "0"
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+request_id: contextvars.ContextVar[str | None] = contextvars.ContextVar("request_id", default=None)
+
+access_logger = logging.getLogger("fitnessapp.access")
+
+# Attributes every LogRecord has; anything else came from ``extra=``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with ``extra=`` fields at the top level"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that captures the request id and leaves formatting to the listener.
+
+    The stock handler formats the message on the calling thread; here only
+    the parts that cannot cross threads are resolved: the request id (a
+    contextvar) and the traceback (which holds live frames).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = request_id.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(level: str = LOG_LEVEL, stream=None) -> logging.handlers.QueueListener:
+    """Route the root logger through a queue to a JSON stream handler.
+
+    Call once per worker process (the listener thread does not survive a
+    fork) and ``stop()`` the returned listener on shutdown to flush it.
+    """
+    log_queue = queue.SimpleQueue()
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(ContextQueueHandler(log_queue))
+    root.setLevel(level)
+    if ACCESS_LOG:
+        # RequestIdMiddleware writes the access log; don't log every request twice
+        uvicorn_access = logging.getLogger("uvicorn.access")
+        uvicorn_access.handlers.clear()
+        uvicorn_access.propagate = False
+    listener.start()
+    return listener
+
+
+class RequestIdMiddleware:
+    """ASGI middleware assigning each request an id and logging its outcome"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        rid = dict(scope["headers"]).get(REQUEST_ID_HEADER, b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        token = request_id.set(rid)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER, rid.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            if ACCESS_LOG and access_logger.isEnabledFor(logging.INFO):
+                route = scope.get("route")
+                access_logger.info(
+                    "request",
+                    extra={
+                        "method": scope["method"],
+                        "route": getattr(route, "path", None) or scope["path"],
+                        "status": status,
+                        "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                    },
+                )
+            request_id.reset(token)
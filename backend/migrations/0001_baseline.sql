@@ -0,0 +1,62 @@
+-- Baseline schema additions on top of flutter_app/sql/create_database.
+-- These used to run on every startup from the lifespan hook.
+
+ALTER TABLE IF EXISTS training
+ADD COLUMN IF NOT EXISTS user_id INT;
+
+ALTER TABLE IF EXISTS training_exercise
+ADD COLUMN IF NOT EXISTS sets INT,
+ADD COLUMN IF NOT EXISTS reps INT,
+ADD COLUMN IF NOT EXISTS weight FLOAT,
+ADD COLUMN IF NOT EXISTS notes TEXT;
+
+-- Backfill training.user_id for rows saved before the column existed
+UPDATE training t
+SET user_id = bm.user_id
+FROM training_body tb
+JOIN body_metrics bm ON bm.body_id = tb.body_id
+WHERE t.train_id = tb.train_id
+  AND t.user_id IS NULL;
+
+CREATE TABLE IF NOT EXISTS user_weekly_plan (
+    id SERIAL PRIMARY KEY,
+    user_id INT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    plan JSONB NOT NULL DEFAULT '{}'::jsonb,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id)
+);
+
+CREATE TABLE IF NOT EXISTS user_stats (
+    id SERIAL PRIMARY KEY,
+    user_id INT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    xp INT NOT NULL DEFAULT 0,
+    level INT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id)
+);
+
+CREATE TABLE IF NOT EXISTS user_hidden_charts (
+    id SERIAL PRIMARY KEY,
+    user_id INT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    chart_name TEXT NOT NULL,
+    option TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id, chart_name, option)
+);
+
+-- FR13 - Create Custom Tasks
+CREATE TABLE IF NOT EXISTS user_tasks (
+    id SERIAL PRIMARY KEY,
+    user_id INT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    goal TEXT NOT NULL,
+    frequency TEXT NOT NULL DEFAULT 'daily',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS user_task_completions (
+    id SERIAL PRIMARY KEY,
+    task_id INT NOT NULL REFERENCES user_tasks(id) ON DELETE CASCADE,
+    completed_at DATE NOT NULL DEFAULT CURRENT_DATE,
+    UNIQUE (task_id, completed_at)
+);
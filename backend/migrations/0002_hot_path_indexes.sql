@@ -0,0 +1,38 @@
+-- no-transaction
+-- Secondary indexes for the hot query paths in main.py.
+-- Every statement is idempotent so the file can be re-applied safely;
+-- built CONCURRENTLY so writes to these tables carry on during a rollout.
+
+-- Charts (workout volume, exercise progress) filter training by user and group by day
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_training_user_date
+    ON training (user_id, train_data);
+
+-- training -> training_exercise joins; INCLUDE lets the volume query stay index-only
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_training_exercise_train
+    ON training_exercise (train_id) INCLUDE (exer_id, sets, reps, weight);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_training_exercise_exer
+    ON training_exercise (exer_id, train_id);
+
+-- Chart options start from the user's body_id; other joins go through train_id
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_training_body_body
+    ON training_body (body_id, train_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_training_body_train
+    ON training_body (train_id);
+
+-- Workout history is keyset-paginated on (created_at, workout_id) per user
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_workout_user_created
+    ON user_workout (user_id, created_at DESC, workout_id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_workout_exercise_workout
+    ON user_workout_exercise (workout_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_body_metrics_user
+    ON body_metrics (user_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_tasks_user
+    ON user_tasks (user_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_plan_exercise_exer
+    ON plan_exercise (exer_id);
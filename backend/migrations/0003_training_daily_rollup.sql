@@ -0,0 +1,56 @@
+-- Per-user, per-exercise, per-day training totals for the progress charts.
+-- Kept up to date by the workout save/delete endpoints, so chart queries read
+-- one row per exercise per day instead of re-aggregating every set ever logged.
+
+-- Link training sets to the workout that created them so a deleted workout
+-- can take its sets (and their rollup contribution) with it. Sets logged
+-- before this migration keep a NULL workout_id.
+ALTER TABLE training ADD COLUMN IF NOT EXISTS workout_id INT
+    REFERENCES user_workout (workout_id) ON DELETE CASCADE;
+
+CREATE INDEX IF NOT EXISTS idx_training_workout
+    ON training (workout_id) WHERE workout_id IS NOT NULL;
+
+ALTER TABLE training_exercise DROP CONSTRAINT IF EXISTS training_exercise_train_id_fkey;
+ALTER TABLE training_exercise ADD CONSTRAINT training_exercise_train_id_fkey
+    FOREIGN KEY (train_id) REFERENCES training (train_id) ON DELETE CASCADE;
+
+ALTER TABLE training_body DROP CONSTRAINT IF EXISTS training_body_train_id_fkey;
+ALTER TABLE training_body ADD CONSTRAINT training_body_train_id_fkey
+    FOREIGN KEY (train_id) REFERENCES training (train_id) ON DELETE CASCADE;
+
+-- Strength sets store reps/weight, cardio sets store minutes/distance
+CREATE TABLE IF NOT EXISTS training_daily_rollup (
+    user_id INT NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    exer_id INT NOT NULL REFERENCES exercise (exer_id) ON DELETE CASCADE,
+    volume_kg FLOAT NOT NULL DEFAULT 0,
+    max_weight_kg FLOAT NOT NULL DEFAULT 0,
+    total_reps INT NOT NULL DEFAULT 0,
+    total_sets INT NOT NULL DEFAULT 0,
+    cardio_minutes INT NOT NULL DEFAULT 0,
+    cardio_distance_km FLOAT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, exer_id)
+);
+
+-- Backfill from the existing history
+INSERT INTO training_daily_rollup (
+    user_id, day, exer_id, volume_kg, max_weight_kg, total_reps,
+    total_sets, cardio_minutes, cardio_distance_km
+)
+SELECT
+    t.user_id,
+    t.train_data::date,
+    te.exer_id,
+    COALESCE(SUM(te.weight * te.reps) FILTER (WHERE e.exer_type::text <> 'cardio'), 0),
+    COALESCE(MAX(te.weight) FILTER (WHERE e.exer_type::text <> 'cardio'), 0),
+    COALESCE(SUM(te.reps) FILTER (WHERE e.exer_type::text <> 'cardio'), 0),
+    COUNT(*),
+    COALESCE(SUM(t.train_mins) FILTER (WHERE e.exer_type::text = 'cardio'), 0),
+    COALESCE(SUM(t.train_effort) FILTER (WHERE e.exer_type::text = 'cardio'), 0)
+FROM training t
+JOIN training_exercise te ON te.train_id = t.train_id
+JOIN exercise e ON e.exer_id = te.exer_id
+WHERE t.user_id IS NOT NULL AND t.train_data IS NOT NULL
+GROUP BY t.user_id, t.train_data::date, te.exer_id
+ON CONFLICT (user_id, day, exer_id) DO NOTHING;
@@ -0,0 +1,19 @@
+-- Tell API workers when the exercise or recipe catalogs change so their
+-- in-memory copies (catalog.py) are reloaded. The payload is the table name.
+
+CREATE OR REPLACE FUNCTION notify_catalog_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('catalog_changed', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS exercise_catalog_changed ON exercise;
+CREATE TRIGGER exercise_catalog_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON exercise
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_changed();
+
+DROP TRIGGER IF EXISTS recipe_catalog_changed ON recipe;
+CREATE TRIGGER recipe_catalog_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON recipe
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_changed();
@@ -0,0 +1,19 @@
+-- Ranked full-text search over the exercise catalog, with trigram matching on
+-- names so misspelt queries still find something.
+
+-- Always in public, and referenced qualified, so the index and search query
+-- resolve whatever search_path the connection uses.
+CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public;
+
+-- Names weigh more than descriptions when ranking
+ALTER TABLE exercise ADD COLUMN IF NOT EXISTS exer_search tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(exer_name, '')), 'A')
+        || setweight(to_tsvector('english', COALESCE(exer_descrip, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_exercise_search
+    ON exercise USING GIN (exer_search);
+
+CREATE INDEX IF NOT EXISTS idx_exercise_name_trgm
+    ON exercise USING GIN (exer_name public.gin_trgm_ops);
@@ -0,0 +1,29 @@
+-- Append-only ledger of XP grants. user_stats keeps the compacted running
+-- total; events not yet folded into it have compacted = FALSE.
+
+CREATE TABLE IF NOT EXISTS xp_event (
+    event_id BIGSERIAL PRIMARY KEY,
+    user_id INT NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+    source TEXT NOT NULL DEFAULT 'manual',
+    amount INT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    compacted BOOLEAN NOT NULL DEFAULT FALSE
+);
+
+-- Pending events per user (read path) and in arrival order (compactor)
+CREATE INDEX IF NOT EXISTS idx_xp_event_pending_user
+    ON xp_event (user_id) INCLUDE (amount) WHERE NOT compacted;
+
+CREATE INDEX IF NOT EXISTS idx_xp_event_pending_order
+    ON xp_event (event_id) WHERE NOT compacted;
+
+CREATE INDEX IF NOT EXISTS idx_xp_event_user
+    ON xp_event (user_id, created_at);
+
+-- XP earned before the ledger existed becomes one already-compacted opening
+-- balance per user, so the ledger always sums to user_stats.xp
+INSERT INTO xp_event (user_id, source, amount, compacted)
+SELECT s.user_id, 'opening_balance', s.xp, TRUE
+FROM user_stats s
+WHERE s.xp <> 0
+  AND NOT EXISTS (SELECT 1 FROM xp_event e WHERE e.user_id = s.user_id);
@@ -0,0 +1,13 @@
+-- no-transaction
+-- Let each worker's leaderboard refresher find users whose XP or streak
+-- changed since its last pass without scanning the tables.
+-- Built CONCURRENTLY so writes to these tables carry on during a rollout.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_xp_event_created
+    ON xp_event (created_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_stats_updated
+    ON user_stats (updated_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_streak_updated
+    ON user_streak (updated_at);
@@ -0,0 +1,9 @@
+-- no-transaction
+-- Best set per day for one exercise (the flutter_app/python exercise charts):
+-- a user's training newest day first, strongest set first within a day, so
+-- DISTINCT ON (day) ... LIMIT n reads the index in order and stops after n
+-- days instead of sorting the user's whole history.
+-- Built CONCURRENTLY so writes to the table carry on during a rollout.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_training_user_day_best
+    ON training (user_id, (train_data::date) DESC, train_effort DESC, train_reps DESC)
+    INCLUDE (train_id, train_mins);
@@ -0,0 +1,72 @@
+"""Daily activity streaks for FitnessApp.
+
+Logging a workout and completing a task both count as activity for the day.
+The whole streak transition (extend or restart the streak, bump the weekly
+counter, roll over to a new week) happens in one upsert on ``user_streak``,
+so concurrent requests from the same user serialize on the row instead of
+overwriting each other's read-modify-write.
+"""
+from datetime import date
+
+STREAK_FIELDS = """
+    current_streak,
+    longest_streak,
+    streak_start_date,
+    last_workout_date,
+    workouts_this_week,
+    week_start_date
+"""
+
+# $1 = user_id, $2 = today. The WHERE clause makes a second activity on the
+# same day a no-op (no row is returned).
+RECORD_ACTIVITY_SQL = f"""
+    INSERT INTO user_streak AS s (
+        user_id, current_streak, longest_streak, streak_start_date,
+        last_workout_date, workouts_this_week, week_start_date
+    )
+    VALUES ($1, 1, 1, $2::date, $2::date, 1, date_trunc('week', $2::date)::date)
+    ON CONFLICT (user_id) DO UPDATE SET
+        current_streak = CASE
+            WHEN s.last_workout_date = $2::date - 1 THEN COALESCE(s.current_streak, 0) + 1
+            ELSE 1
+        END,
+        longest_streak = GREATEST(
+            COALESCE(s.longest_streak, 0),
+            CASE
+                WHEN s.last_workout_date = $2::date - 1 THEN COALESCE(s.current_streak, 0) + 1
+                ELSE 1
+            END
+        ),
+        streak_start_date = CASE
+            WHEN s.last_workout_date = $2::date - 1 THEN COALESCE(s.streak_start_date, $2::date)
+            ELSE $2::date
+        END,
+        last_workout_date = $2::date,
+        workouts_this_week = CASE
+            WHEN s.week_start_date IS NULL OR $2::date - s.week_start_date >= 7 THEN 1
+            ELSE COALESCE(s.workouts_this_week, 0) + 1
+        END,
+        week_start_date = CASE
+            WHEN s.week_start_date IS NULL OR $2::date - s.week_start_date >= 7
+                THEN date_trunc('week', $2::date)::date
+            ELSE s.week_start_date
+        END,
+        updated_at = NOW()
+    WHERE s.last_workout_date IS DISTINCT FROM $2::date
+    RETURNING {STREAK_FIELDS}
+"""
+
+
+async def record_activity(connection, user_id: int, today: date | None = None):
+    """Count today as an active day for the user.
+
+    Returns the new streak row, or None if today was already counted.
+    """
+    return await connection.fetchrow(RECORD_ACTIVITY_SQL, user_id, today or date.today())
+
+
+async def get_streak_row(connection, user_id: int):
+    return await connection.fetchrow(
+        f"SELECT {STREAK_FIELDS} FROM user_streak WHERE user_id = $1",
+        user_id,
+    )
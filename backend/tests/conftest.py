@@ -2,17 +2,25 @@ import pytest
 import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 from httpx import AsyncClient, ASGITransport
+import shutil
+import socket
+import subprocess
 import sys
 import os
 
 # Add the backend directory to sys.path so we can import main
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from main import app
+from main import app, catalog, leaderboards
 
 @pytest.fixture
 def mock_conn():
-    return AsyncMock()
+    conn = AsyncMock()
+    # connection.transaction() is a sync call returning an async context manager
+    conn.transaction = MagicMock()
+    conn.transaction.return_value.__aenter__ = AsyncMock(return_value=None)
+    conn.transaction.return_value.__aexit__ = AsyncMock(return_value=False)
+    return conn
 
 @pytest.fixture
 def mock_db_pool(mock_conn):
@@ -26,6 +34,9 @@ def mock_db_pool(mock_conn):
 async def client(mock_db_pool):
     # Explicitly set app state db_pool to bypass lifespan issues in tests
     app.state.db_pool = mock_db_pool
+    # Each test mocks its own catalog rows
+    catalog.invalidate()
+    leaderboards.reset()
     
     # We use ASGITransport for FastAPI
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
@@ -39,3 +50,53 @@ def event_loop():
         loop = asyncio.new_event_loop()
     yield loop
     loop.close()
+
+
+def _postgres_bindir() -> str | None:
+    """Directory holding initdb/pg_ctl, from PATH or pg_config"""
+    pg_ctl = shutil.which("pg_ctl")
+    if pg_ctl:
+        return os.path.dirname(pg_ctl)
+    if shutil.which("pg_config"):
+        bindir = subprocess.run(["pg_config", "--bindir"], capture_output=True, text=True).stdout.strip()
+        if os.path.exists(os.path.join(bindir, "pg_ctl")):
+            return bindir
+    return None
+
+
+@pytest.fixture(scope="session")
+def postgres_dsn(tmp_path_factory):
+    """A disposable PostgreSQL database.
+
+    Uses TEST_DATABASE_URL when set; otherwise starts a throwaway cluster with
+    the local PostgreSQL server binaries for the duration of the session.
+    """
+    if os.getenv("TEST_DATABASE_URL"):
+        yield os.environ["TEST_DATABASE_URL"]
+        return
+    bindir = _postgres_bindir()
+    if bindir is None:
+        pytest.skip("needs TEST_DATABASE_URL or local PostgreSQL server binaries (initdb, pg_ctl)")
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        pytest.skip("initdb refuses to run as root; set TEST_DATABASE_URL instead")
+
+    data_dir = tmp_path_factory.mktemp("pgdata")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    subprocess.run(
+        [os.path.join(bindir, "initdb"), "-D", str(data_dir), "-U", "postgres", "--auth=trust", "--no-sync"],
+        check=True,
+        capture_output=True,
+    )
+    pg_ctl = os.path.join(bindir, "pg_ctl")
+    subprocess.run(
+        [pg_ctl, "-D", str(data_dir), "-l", str(data_dir / "server.log"), "-w", "start",
+         "-o", f"-p {port} -k {data_dir} -c listen_addresses=127.0.0.1 -c fsync=off"],
+        check=True,
+        capture_output=True,
+    )
+    try:
+        yield f"postgresql://postgres@127.0.0.1:{port}/postgres"
+    finally:
+        subprocess.run([pg_ctl, "-D", str(data_dir), "-m", "immediate", "stop"], capture_output=True)
@@ -1,5 +1,8 @@
+import asyncio
+import threading
 import pytest
-from auth import hash_password
+import main
+from auth import hash_password, PasswordHashPool, PasswordHashPoolFull
 
 # ==================== FR1: ACCOUNT CREATION TESTS ====================
 
@@ -144,3 +147,53 @@ async def test_tc008_empty_credentials(client, mock_conn):
     )
     
     assert response.status_code in [401, 404, 422]
+
+# ==================== PASSWORD HASHING POOL ====================
+
+@pytest.mark.asyncio
+async def test_tc008b_password_pool_rejects_when_saturated():
+    """TC-008b: The hashing pool sheds load once workers and queue are full"""
+    pool = PasswordHashPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    running = asyncio.ensure_future(pool.run(release.wait))
+    queued = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    stats = pool.stats()
+    assert stats["in_flight"] == 1
+    assert stats["queue_depth"] == 1
+
+    with pytest.raises(PasswordHashPoolFull):
+        await pool.run(release.wait)
+
+    release.set()
+    await asyncio.gather(running, queued)
+    stats = pool.stats()
+    assert stats["completed"] == 2
+    assert stats["rejected"] == 1
+    assert stats["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_tc008c_login_returns_503_when_hash_pool_full(client, mock_conn, monkeypatch):
+    """TC-008c: Login reports 503 instead of queueing forever when hashing is saturated"""
+    mock_conn.fetchrow.side_effect = [{
+        "user_id": 1,
+        "user_email": "john@test.com",
+        "user_name": "john",
+        "user_password": "hash"
+    }]
+
+    async def saturated(*args):
+        raise PasswordHashPoolFull()
+
+    monkeypatch.setattr(main, "verify_password_async", saturated)
+
+    response = await client.post(
+        "/api/auth/login",
+        json={"email": "john@test.com", "password": "password123"}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
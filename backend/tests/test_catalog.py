@@ -0,0 +1,77 @@
+import pytest
+
+import main
+from catalog import CatalogCache
+
+EXERCISES = [
+    {"id": 1, "name": "Bench Press", "area": "chest", "type": "strength", "equipment": "barbell", "description": "Press the bar", "video": ""},
+    {"id": 2, "name": "Running", "area": "legs", "type": "cardio", "equipment": "none", "description": "Outdoor run", "video": None},
+]
+
+
+@pytest.mark.asyncio
+async def test_tc072_catalog_loaded_once_and_filtered_in_memory(client, mock_conn):
+    """TC-072: Exercise list, filters and lookups share one catalog load"""
+    mock_conn.fetch.return_value = EXERCISES
+
+    all_exercises = await client.get("/api/exercises")
+    cardio = await client.get("/api/exercises?type=CARDIO")
+    barbell = await client.get("/api/exercises?equipment=barbell")
+    single = await client.get("/api/exercises/1")
+
+    assert [e["id"] for e in all_exercises.json()] == [1, 2]
+    assert [e["id"] for e in cardio.json()] == [2]
+    assert [e["id"] for e in barbell.json()] == [1]
+    assert single.json()["name"] == "Bench Press"
+    assert mock_conn.fetch.await_count == 1
+    mock_conn.fetchrow.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_tc073_catalog_conditional_get_returns_304(client, mock_conn):
+    """TC-073: A client presenting the current ETag gets 304 with no body"""
+    mock_conn.fetch.return_value = EXERCISES
+
+    first = await client.get("/api/exercises")
+    etag = first.headers["etag"]
+    assert "max-age" in first.headers["cache-control"]
+
+    second = await client.get("/api/exercises", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+
+    stale = await client.get("/api/exercises", headers={"If-None-Match": '"outdated"'})
+    assert stale.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_tc074_catalog_notify_invalidates_table(client, mock_conn):
+    """TC-074: A catalog_changed notification makes the next request reload with a new ETag"""
+    mock_conn.fetch.return_value = EXERCISES
+    first = await client.get("/api/exercises")
+
+    mock_conn.fetch.return_value = EXERCISES[:1]
+    main.catalog._on_notify(None, 1, "catalog_changed", "exercise")
+    second = await client.get("/api/exercises")
+
+    assert len(second.json()) == 1
+    assert second.headers["etag"] != first.headers["etag"]
+    assert mock_conn.fetch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_tc075_catalog_ttl_forces_reload(mock_db_pool, mock_conn, monkeypatch):
+    """TC-075: Tables older than the TTL are reloaded even without a notification"""
+    mock_conn.fetch.return_value = []
+    cache = CatalogCache({"exercise": ("SELECT 1", "id", dict)}, ttl=60)
+    clock = [1000.0]
+    monkeypatch.setattr("catalog.time.monotonic", lambda: clock[0])
+
+    await cache.get(mock_db_pool, "exercise")
+    clock[0] += 30
+    await cache.get(mock_db_pool, "exercise")
+    assert cache.loads == 1
+
+    clock[0] += 31
+    await cache.get(mock_db_pool, "exercise")
+    assert cache.loads == 2
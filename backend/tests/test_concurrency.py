@@ -0,0 +1,150 @@
+"""Concurrency tests against a real PostgreSQL database.
+
+Parallel requests from the same user must not lose updates. They use the
+``postgres_dsn`` fixture: TEST_DATABASE_URL if set, otherwise a throwaway
+cluster started with the local PostgreSQL binaries; without either they are
+skipped. Everything lives in a ``concurrency_check`` schema.
+"""
+import asyncio
+from datetime import date, timedelta
+from pathlib import Path
+
+import asyncpg
+import pytest
+
+from main import _refresh_training_rollup
+from migrate import run_migrations
+from streaks import record_activity
+from xp import add_xp, compact_xp_events, get_xp, rebuild_user_stats
+
+SCHEMA = "concurrency_check"
+BASE_SCHEMA_SQL = Path(__file__).resolve().parents[2] / "flutter_app" / "sql" / "create_database"
+PARALLEL = 25
+
+
+@pytest.fixture
+async def db_pool(postgres_dsn):
+    conn = await asyncpg.connect(postgres_dsn)
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        await conn.execute(f"SET search_path TO {SCHEMA}")
+        await conn.execute(BASE_SCHEMA_SQL.read_text().replace("SET search_path TO public;", ""))
+        await run_migrations(conn)
+    finally:
+        await conn.close()
+
+    pool = await asyncpg.create_pool(
+        postgres_dsn, min_size=PARALLEL, max_size=PARALLEL, server_settings={"search_path": SCHEMA}
+    )
+    try:
+        yield pool
+    finally:
+        await pool.close()
+        conn = await asyncpg.connect(postgres_dsn)
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+async def _create_user(pool) -> int:
+    async with pool.acquire() as conn:
+        return await conn.fetchval(
+            "INSERT INTO users (user_name, user_email, user_password) VALUES ('c', 'c@test', 'x') RETURNING user_id"
+        )
+
+
+async def _in_parallel(pool, func, count=PARALLEL):
+    async def one():
+        async with pool.acquire() as conn:
+            return await func(conn)
+    return await asyncio.gather(*(one() for _ in range(count)))
+
+
+@pytest.mark.asyncio
+async def test_parallel_activity_counts_a_day_once(db_pool):
+    """Many simultaneous workout saves / task completions extend the streak exactly once"""
+    user_id = await _create_user(db_pool)
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    async with db_pool.acquire() as conn:
+        await record_activity(conn, user_id, yesterday)
+
+    results = await _in_parallel(db_pool, lambda conn: record_activity(conn, user_id, today))
+
+    assert sum(1 for row in results if row is not None) == 1
+    async with db_pool.acquire() as conn:
+        streak = await conn.fetchrow("SELECT * FROM user_streak WHERE user_id = $1", user_id)
+    assert streak["current_streak"] == 2
+    assert streak["longest_streak"] == 2
+    assert streak["last_workout_date"] == today
+    assert streak["streak_start_date"] == yesterday
+
+
+@pytest.mark.asyncio
+async def test_parallel_first_activity_creates_one_row(db_pool):
+    """Racing first-ever activity never fails on the unique user_id"""
+    user_id = await _create_user(db_pool)
+
+    await _in_parallel(db_pool, lambda conn: record_activity(conn, user_id, date.today()))
+
+    async with db_pool.acquire() as conn:
+        rows = await conn.fetch("SELECT current_streak, workouts_this_week FROM user_streak WHERE user_id = $1", user_id)
+    assert [tuple(r) for r in rows] == [(1, 1)]
+
+
+@pytest.mark.asyncio
+async def test_parallel_xp_grants_are_not_lost(db_pool):
+    """Simultaneous XP grants and compaction passes for one user all count"""
+    user_id = await _create_user(db_pool)
+    expected = PARALLEL * 10
+
+    turns = iter(range(PARALLEL * 2))
+
+    async def grant_or_compact(conn):
+        if next(turns) % 2:
+            return await compact_xp_events(conn, batch_size=3)
+        return await add_xp(conn, user_id, 10)
+
+    await _in_parallel(db_pool, grant_or_compact, count=PARALLEL * 2)
+
+    async with db_pool.acquire() as conn:
+        assert (await get_xp(conn, user_id))["xp"] == expected
+        await compact_xp_events(conn)
+        stats = await conn.fetchrow("SELECT xp, level FROM user_stats WHERE user_id = $1", user_id)
+        assert (stats["xp"], stats["level"]) == (expected, expected // 100 + 1)
+
+        await conn.execute("UPDATE user_stats SET xp = 0, level = 1 WHERE user_id = $1", user_id)
+        await rebuild_user_stats(conn, user_id)
+        assert (await get_xp(conn, user_id))["xp"] == expected
+
+
+@pytest.mark.asyncio
+async def test_parallel_same_day_saves_keep_every_set(db_pool):
+    """Simultaneous workout saves on one day all land in the daily rollup"""
+    user_id = await _create_user(db_pool)
+    async with db_pool.acquire() as conn:
+        exer_id = await conn.fetchval("SELECT exer_id FROM exercise WHERE exer_type::text <> 'cardio' LIMIT 1")
+
+    async def save(conn):
+        async with conn.transaction():
+            train_id = await conn.fetchval(
+                "INSERT INTO training (user_id, train_data, train_reps, train_effort) "
+                "VALUES ($1, NOW(), 5, 10) RETURNING train_id",
+                user_id,
+            )
+            await conn.execute(
+                "INSERT INTO training_exercise (train_id, exer_id, sets, reps, weight) VALUES ($1, $2, 1, 5, 10)",
+                train_id,
+                exer_id,
+            )
+            await _refresh_training_rollup(conn, user_id)
+
+    await _in_parallel(db_pool, save)
+
+    async with db_pool.acquire() as conn:
+        row = await conn.fetchrow(
+            "SELECT total_sets, volume_kg FROM training_daily_rollup WHERE user_id = $1 AND exer_id = $2",
+            user_id,
+            exer_id,
+        )
+    assert (row["total_sets"], row["volume_kg"]) == (PARALLEL, PARALLEL * 50)
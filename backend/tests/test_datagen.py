@@ -0,0 +1,65 @@
+import random
+from datetime import date
+
+import pytest
+
+from datagen import COLUMNS, RESERVED_IDS, Volumes, generate_batch, load_batch
+
+TODAY = date(2026, 3, 4)
+EXERCISES = [(1, "strength"), (2, "strength"), (3, "cardio"), (4, "strength"), (5, "strength"),
+             (6, "cardio"), (7, "strength"), (8, "strength")]
+RECIPES = [(1, "Oats", 350.0), (2, "Salad", 200.0), (3, "Pasta", 600.0)]
+VOLUMES = Volumes(users=20, workouts_per_user=30, sets_per_workout=8, days=180, meal_plan_days=3)
+
+
+def _batch(seed=1):
+    return generate_batch(random.Random(seed), VOLUMES.users, VOLUMES, EXERCISES, RECIPES, "hash", TODAY)
+
+
+def test_tc089_generated_rows_are_consistent_and_reproducible():
+    """TC-089: Generated rows reference each other correctly and depend only on the seed"""
+    batch = _batch()
+    placed = batch.placed({"users": 100, "body_metrics": 200, "user_workout": 300, "training": 400, "user_tasks": 500})
+
+    assert _batch().rows == batch.rows
+    assert _batch(seed=2).rows != batch.rows
+    for table, rows in placed.items():
+        assert all(len(row) == len(COLUMNS[table]) for row in rows), table
+
+    users = {row[0] for row in placed["users"]}
+    bodies = {row[0]: row[1] for row in placed["body_metrics"]}
+    workouts = {row[0]: row[1] for row in placed["user_workout"]}
+    trainings = {row[0]: row for row in placed["training"]}
+    assert users == set(range(100, 120))
+    assert set(bodies.values()) == users
+    assert set(workouts.values()) <= users
+    assert {row[0] for row in placed["training_exercise"]} == set(trainings)
+    for train_id, user_id, workout_id, *_ in trainings.values():
+        assert workouts[workout_id] == user_id
+    for train_id, body_id in placed["training_body"]:
+        assert bodies[body_id] == trainings[train_id][1]
+    assert len(placed["user_task_completions"]) == len(set(placed["user_task_completions"]))
+    assert len({row[:2] for row in placed["user_meal_plan"]}) == len(placed["user_meal_plan"])
+
+    # Sets per workout and workouts per user average out near the requested means
+    assert 4 <= len(trainings) / len(workouts) <= 12
+    assert 10 <= len(workouts) / len(users) <= 60
+    xp = {row[0]: row[1] for row in placed["user_stats"]}
+    assert {row[0]: row[2] for row in placed["xp_event"]} == {user: amount for user, amount in xp.items() if amount}
+
+
+@pytest.mark.asyncio
+async def test_tc090_load_batch_copies_tables_in_dependency_order(mock_conn):
+    """TC-090: Ids are reserved per table, then every table is COPYed before the rollup"""
+    batch = _batch()
+    mock_conn.fetchval.side_effect = [1000, 2000, 3000, 4000, 5000]
+
+    counts = await load_batch(mock_conn, batch)
+
+    reserved = [call.args[1:] for call in mock_conn.fetchval.call_args_list]
+    assert reserved == [(table, column, batch.counts[name]) for name, (table, column) in RESERVED_IDS.items()]
+    copied = [call.args[0] for call in mock_conn.copy_records_to_table.call_args_list]
+    assert copied == [table for table in COLUMNS if batch.rows[table]]
+    assert counts["training"] == batch.counts["training"]
+    rollup_users = mock_conn.execute.call_args_list[-1].args[1]
+    assert rollup_users == list(range(1000, 1000 + VOLUMES.users))
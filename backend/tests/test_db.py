@@ -0,0 +1,212 @@
+import asyncio
+from collections import namedtuple
+
+import pytest
+
+import db
+from auth import create_access_token
+from db import Histogram, InstrumentedPool, PoolAcquireTimeout, PoolMetrics
+import main
+from main import app
+
+FakeRoute = namedtuple("FakeRoute", "path")
+FakeRecord = namedtuple("FakeRecord", "elapsed exception")
+
+
+class FakeAsyncpgPool:
+    def __init__(self, size=3, idle=1, acquire_error=None):
+        self.size = size
+        self.idle = idle
+        self.acquire_error = acquire_error
+        self.released = []
+        self.timeouts = []
+
+    async def acquire(self, timeout=None):
+        self.timeouts.append(timeout)
+        if self.acquire_error:
+            raise self.acquire_error
+        return "conn"
+
+    async def release(self, connection):
+        self.released.append(connection)
+
+    def get_size(self):
+        return self.size
+
+    def get_idle_size(self):
+        return self.idle
+
+    def get_min_size(self):
+        return 1
+
+    def get_max_size(self):
+        return 5
+
+
+def test_tc067_histogram_buckets_and_percentiles():
+    """TC-067: Latencies land in the first bucket whose bound covers them"""
+    histogram = Histogram(buckets=(1, 10, 100))
+    for value in (0.5, 1, 7, 50, 5000):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 5
+    assert snapshot["buckets"] == {"1": 2, "10": 1, "100": 1, "+Inf": 1}
+    assert snapshot["p50_ms"] == 10
+    assert snapshot["p99_ms"] == 5000
+
+
+@pytest.mark.asyncio
+async def test_tc068_instrumented_pool_records_wait_and_releases():
+    """TC-068: acquire() passes the timeout, records the wait and releases the connection"""
+    raw = FakeAsyncpgPool()
+    pool = InstrumentedPool(raw, acquire_timeout=2.5, metrics=PoolMetrics())
+
+    async with pool.acquire() as connection:
+        assert connection == "conn"
+
+    assert raw.timeouts == [2.5]
+    assert raw.released == ["conn"]
+    stats = pool.stats()
+    assert stats["in_use"] == 2
+    assert stats["idle"] == 1
+    assert stats["waiting"] == 0
+    assert stats["acquire_wait"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_tc069_instrumented_pool_timeout_is_503():
+    """TC-069: A pool that stays exhausted yields 503 instead of hanging"""
+    pool = InstrumentedPool(FakeAsyncpgPool(acquire_error=asyncio.TimeoutError()), metrics=PoolMetrics())
+
+    with pytest.raises(PoolAcquireTimeout) as exc_info:
+        async with pool.acquire():
+            pass
+
+    assert exc_info.value.status_code == 503
+    assert pool.stats()["acquire_timeouts"] == 1
+
+
+
+@pytest.mark.asyncio
+async def test_tc096_handlers_surface_acquire_timeout_as_503(client):
+    """TC-096: Handlers pass the pool's 503 through instead of turning it into a 500"""
+    app.state.db_pool = InstrumentedPool(
+        FakeAsyncpgPool(acquire_error=asyncio.TimeoutError()), metrics=PoolMetrics()
+    )
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': '1'})}"}
+
+    for method, url, body in [
+        ("GET", "/api/user/stats", None),
+        ("POST", "/api/user/stats/xp", {"amount": 10}),
+        ("POST", "/api/workouts", {"exercises": []}),
+        ("GET", "/api/workouts", None),
+        ("GET", "/chart/total-volume", None),
+        ("POST", "/api/charts/dashboard", {"charts": []}),
+    ]:
+        response = await client.request(method, url, json=body, headers=headers)
+        assert response.status_code == 503, url
+        assert response.headers["Retry-After"] == "1"
+
+
+def test_tc070_query_latency_keyed_on_route_template(monkeypatch):
+    """TC-070: Query timings are grouped by route template, not by concrete URL"""
+    metrics = PoolMetrics()
+    monkeypatch.setattr(db, "pool_metrics", metrics)
+
+    token = db._current_scope.set({"method": "GET", "route": FakeRoute("/api/workouts/{workout_id}")})
+    try:
+        db._log_query(FakeRecord(elapsed=0.004, exception=None))
+        db._log_query(FakeRecord(elapsed=0.020, exception=RuntimeError()))
+    finally:
+        db._current_scope.reset(token)
+    db._log_query(FakeRecord(elapsed=0.001, exception=None))
+
+    assert metrics.queries["GET /api/workouts/{workout_id}"].count == 2
+    assert metrics.queries["background"].count == 1
+    assert metrics.query_errors == 1
+
+
+@pytest.mark.asyncio
+async def test_tc071_metrics_endpoint_includes_database(client, monkeypatch):
+    """TC-071: /api/metrics exposes the database section"""
+    monkeypatch.setattr(main, "METRICS_TOKEN", "scrape-secret")
+    response = await client.get("/api/metrics", headers={"Authorization": "Bearer scrape-secret"})
+
+    assert response.status_code == 200
+    assert "queries" in response.json()["database"]
+
+
+def test_tc083_pool_size_from_connection_budget(monkeypatch):
+    """TC-083: Without DB_POOL_MAX_SIZE each worker takes its share of the budget"""
+    monkeypatch.delenv("DB_POOL_MAX_SIZE", raising=False)
+    monkeypatch.delenv("DB_CONNECTION_BUDGET", raising=False)
+    assert db._pool_max_size() == 5
+
+    monkeypatch.setenv("DB_CONNECTION_BUDGET", "40")
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    # 10 per worker, one of which is the catalog listener
+    assert db._pool_max_size() == 9
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "64")
+    assert db._pool_max_size() == 1
+
+    monkeypatch.setenv("DB_POOL_MAX_SIZE", "7")
+    assert db._pool_max_size() == 7
+
+
+@pytest.mark.asyncio
+async def test_tc087_request_middleware_counts_queries(monkeypatch):
+    """TC-087: Each request records its latency, status, query count and DB time"""
+    metrics = PoolMetrics()
+    monkeypatch.setattr(db, "pool_metrics", metrics)
+    loop = asyncio.get_running_loop()
+
+    async def app(scope, receive, send):
+        scope["route"] = FakeRoute("/api/workouts")
+        for elapsed in (0.002, 0.003):
+            # asyncpg schedules query loggers with call_soon
+            loop.call_soon(db._log_query, FakeRecord(elapsed=elapsed, exception=None))
+        await send({"type": "http.response.start", "status": 201})
+
+    async def send(message):
+        pass
+
+    await db.RequestRouteMiddleware(app)({"type": "http", "method": "POST"}, None, send)
+
+    route = metrics.requests["POST /api/workouts"]
+    assert route.statuses == {201: 1}
+    assert route.queries.total == 2
+    assert route.db_time.total == pytest.approx(5)
+    assert route.latency.count == 1
+
+
+@pytest.mark.asyncio
+async def test_tc088_prometheus_endpoint(client, mock_conn, monkeypatch):
+    """TC-088: /metrics renders per-route histograms in the Prometheus text format"""
+    monkeypatch.setattr(db, "pool_metrics", PoolMetrics())
+    monkeypatch.setattr(main, "METRICS_TOKEN", "scrape-secret")
+    await client.get("/health/live")
+
+    response = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert "# TYPE fitnessapp_http_request_duration_seconds histogram" in body
+    assert 'fitnessapp_http_requests_total{method="GET",route="/health/live",status="200"} 1' in body
+    assert 'fitnessapp_db_queries_per_request_bucket{method="GET",route="/health/live",le="0"} 1' in body
+    assert 'fitnessapp_http_request_duration_seconds_bucket{method="GET",route="/health/live",le="+Inf"} 1' in body
+
+
+@pytest.mark.asyncio
+async def test_tc098_metrics_need_token(client, monkeypatch):
+    """TC-098: Metrics endpoints are off without METRICS_TOKEN and reject a wrong token"""
+    for url in ("/metrics", "/api/metrics"):
+        monkeypatch.setattr(main, "METRICS_TOKEN", None)
+        assert (await client.get(url)).status_code == 404
+
+        monkeypatch.setattr(main, "METRICS_TOKEN", "scrape-secret")
+        assert (await client.get(url)).status_code == 401
+        response = await client.get(url, headers={"Authorization": "Bearer wrong"})
+        assert response.status_code == 401
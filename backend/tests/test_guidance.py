@@ -65,3 +65,26 @@ async def test_tc041_get_exercise_invalid_id(client, mock_conn):
     response = await client.get("/api/exercises/9999")
     assert response.status_code == 404
     assert "not found" in response.json()["detail"].lower()
+
+@pytest.mark.asyncio
+async def test_tc041b_search_exercises_ranked_prefix_query(client, mock_conn):
+    """TC-041b: Search sends a prefix tsquery plus the raw text for trigram matching"""
+    mock_conn.fetch.return_value = [
+        {"id": 1, "name": "Bench Press", "area": "chest", "type": "strength", "equipment": "barbell", "description": "", "video": ""}
+    ]
+
+    response = await client.get("/api/exercises/search?q=Bench pr&limit=5&offset=10")
+
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "Bench Press"
+    assert mock_conn.fetch.await_args.args[1:] == ("bench:* & pr:*", "Bench pr", 5, 10)
+
+@pytest.mark.asyncio
+async def test_tc041c_search_exercises_rejects_bad_paging(client, mock_conn):
+    """TC-041c: Search limits are bounded and punctuation-only queries skip the database"""
+    assert (await client.get("/api/exercises/search?q=bench&limit=1000")).status_code == 422
+
+    response = await client.get("/api/exercises/search?q=%26%7C!")
+    assert response.status_code == 200
+    assert response.json() == []
+    mock_conn.fetch.assert_not_awaited()
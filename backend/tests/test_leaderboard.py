@@ -0,0 +1,164 @@
+from datetime import datetime
+
+import pytest
+
+import main
+from auth import create_access_token
+from leaderboard import REFRESH_OVERLAP, Leaderboard, LeaderboardService
+
+
+def test_tc076_leaderboard_ranks_ties_and_updates():
+    """TC-076: Equal scores share a rank and score changes move the user"""
+    board = Leaderboard()
+    board.replace_all({1: 100, 2: 300, 3: 100, 4: 50})
+
+    assert board.top(4) == [(1, 2, 300), (2, 1, 100), (2, 3, 100), (4, 4, 50)]
+    assert board.rank(3) == 2
+    assert board.rank(99) is None
+
+    board.set(4, 500)
+    board.add(1, 250)
+    assert board.top(3) == [(1, 4, 500), (2, 1, 350), (3, 2, 300)]
+    assert board.rank(3) == 4
+    assert len(board) == 4
+
+    board.discard(4)
+    board.discard(99)
+    assert board.top(2) == [(1, 1, 350), (2, 2, 300)]
+    assert len(board) == 3
+
+
+@pytest.mark.asyncio
+async def test_tc077_leaderboard_refresh_reads_only_changed_users(mock_conn):
+    """TC-077: A refresh re-reads absolute scores for users changed since the last sync"""
+    service = LeaderboardService()
+    now = datetime(2024, 5, 15, 12, 0)
+    mock_conn.fetchval.return_value = now
+    mock_conn.fetch.side_effect = [
+        [{"user_id": 1, "score": 120}, {"user_id": 2, "score": 80}],  # xp
+        [{"user_id": 1, "score": 20}],  # weekly xp
+        [{"user_id": 2, "score": 4}],  # streak
+    ]
+    await service.load(mock_conn)
+
+    mock_conn.fetch.side_effect = [
+        [{"user_id": 2}],
+        [{"user_id": 2, "xp": 200, "weekly_xp": 120, "streak": 5}],
+    ]
+    assert await service.refresh(mock_conn) == 1
+
+    assert service.boards["xp"].top(1) == [(1, 2, 200)]
+    assert service.boards["weekly-xp"].rank(2) == 1
+    assert service.boards["streak"].score(2) == 5
+    assert mock_conn.fetch.await_args_list[-2].args[1] == now - REFRESH_OVERLAP
+
+
+@pytest.mark.asyncio
+async def test_tc077b_users_without_a_score_leave_the_board(mock_conn):
+    """TC-077b: A score refreshed to 0 removes the user, matching what a full load gives"""
+    service = LeaderboardService()
+    mock_conn.fetchval.return_value = datetime(2024, 5, 15, 12, 0)
+    mock_conn.fetch.side_effect = [
+        [{"user_id": 1, "score": 120}, {"user_id": 2, "score": 80}, {"user_id": 3, "score": 0}],
+        [{"user_id": 1, "score": 20}],
+        [{"user_id": 2, "score": 4}],
+    ]
+    await service.load(mock_conn)
+    assert service.boards["xp"].score(3) is None
+
+    mock_conn.fetch.side_effect = [
+        [{"user_id": 2}],
+        [{"user_id": 2, "xp": 0, "weekly_xp": 0, "streak": 0}],
+    ]
+    await service.refresh(mock_conn)
+
+    for board in ("xp", "streak"):
+        assert service.boards[board].score(2) is None
+    assert service.standings("xp", 1, 10)["total_users"] == 1
+
+
+@pytest.mark.asyncio
+async def test_tc078_get_leaderboard_top_and_my_rank(client, mock_conn):
+    """TC-078: The endpoint returns the top entries with names plus the caller's rank"""
+    token = create_access_token(data={"sub": "3"})
+    headers = {"Authorization": f"Bearer {token}"}
+    main.leaderboards.loaded = True
+    main.leaderboards.boards["xp"].replace_all({1: 500, 2: 400, 3: 100})
+    mock_conn.fetch.return_value = [{"user_id": 1, "user_name": "ann"}, {"user_id": 2, "user_name": "bob"}]
+
+    response = await client.get("/api/leaderboard/xp?limit=2", headers=headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [(e["rank"], e["username"], e["score"]) for e in data["top"]] == [(1, "ann", 500), (2, "bob", 400)]
+    assert data["me"] == {"rank": 3, "score": 100}
+    assert data["total_users"] == 3
+
+
+@pytest.mark.asyncio
+async def test_tc079_xp_grant_updates_local_boards(client, mock_conn):
+    """TC-079: XP granted through this worker shows up without waiting for a refresh"""
+    token = create_access_token(data={"sub": "2"})
+    headers = {"Authorization": f"Bearer {token}"}
+    main.leaderboards.loaded = True
+    main.leaderboards.boards["xp"].replace_all({1: 150, 2: 100})
+    mock_conn.fetchrow.return_value = {"xp": 160}
+
+    response = await client.post("/api/user/stats/xp", json={"amount": 60}, headers=headers)
+
+    assert response.status_code == 200
+    assert main.leaderboards.boards["xp"].rank(2) == 1
+    assert main.leaderboards.boards["weekly-xp"].score(2) == 60
+
+    response = await client.get("/api/leaderboard/points", headers=headers)
+    assert response.status_code == 404
+
+
+
+@pytest.mark.asyncio
+async def test_tc097_streak_board_waits_for_commit(client, mock_conn):
+    """TC-097: A workout whose commit fails leaves the streak board untouched"""
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': '1'})}"}
+    main.leaderboards.loaded = True
+    streak_row = {"current_streak": 9, "longest_streak": 9, "streak_start_date": None,
+                  "last_workout_date": None, "workouts_this_week": 1, "week_start_date": None}
+
+    mock_conn.fetchrow.side_effect = [{"workout_id": 100}, streak_row]
+    mock_conn.transaction.return_value.__aexit__.side_effect = RuntimeError("commit failed")
+    response = await client.post("/api/workouts", json={"exercises": []}, headers=headers)
+
+    assert response.status_code == 500
+    assert main.leaderboards.boards["streak"].score(1) is None
+
+    mock_conn.fetchrow.side_effect = [{"workout_id": 101}, streak_row]
+    mock_conn.transaction.return_value.__aexit__.side_effect = None
+    response = await client.post("/api/workouts", json={"exercises": []}, headers=headers)
+
+    assert response.status_code == 200
+    assert main.leaderboards.boards["streak"].score(1) == 9
+
+
+def test_tc080_sorted_keys_across_chunk_splits(monkeypatch):
+    """TC-080: Chunked storage stays ordered through splits and removals"""
+    import random
+    from leaderboard import SortedKeys
+
+    monkeypatch.setattr(SortedKeys, "CHUNK", 4)
+    rng = random.Random(7)
+    keys = SortedKeys()
+    reference = []
+    for _ in range(300):
+        key = (rng.randint(-50, 0), rng.randint(0, 10_000))
+        keys.add(key)
+        reference.append(key)
+        if rng.random() < 0.3:
+            victim = reference.pop(rng.randrange(len(reference)))
+            keys.remove(victim)
+        probe = (rng.randint(-50, 0),)
+        assert keys.index(probe) == sum(1 for key in reference if key < probe)
+    reference.sort()
+
+    assert keys.head(len(reference)) == reference
+    assert len(keys) == len(reference)
+    for probe in [(-51,), (-25,), (0,), (1,)]:
+        assert keys.index(probe) == sum(1 for key in reference if key < probe)
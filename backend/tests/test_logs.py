@@ -0,0 +1,83 @@
+import io
+import json
+import logging
+
+import pytest
+
+from auth import create_access_token
+from logs import JsonFormatter, configure_logging, request_id
+
+
+@pytest.fixture
+def log_output():
+    """Route logging through configure_logging() into a buffer for one test"""
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    stream = io.StringIO()
+    listener = configure_logging("INFO", stream=stream)
+
+    def lines():
+        listener.stop()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield lines
+    if listener._thread is not None:
+        listener.stop()
+    root.handlers[:], _ = saved
+    root.setLevel(saved[1])
+
+
+def test_tc084_json_formatter_includes_extra_fields():
+    """TC-084: Records become one JSON object with extra= fields at the top level"""
+    record = logging.LogRecord("fitnessapp", logging.INFO, __file__, 1, "saved %s", ("plan",), None)
+    record.user_id = 7
+    record.request_id = "abc"
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "saved plan"
+    assert entry["level"] == "INFO"
+    assert entry["user_id"] == 7
+    assert entry["request_id"] == "abc"
+
+
+def test_tc085_queue_handler_captures_request_id_and_traceback(log_output):
+    """TC-085: The request id and traceback are captured on the logging thread"""
+    token = request_id.set("req-1")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("fitnessapp").exception("Failed to do %s", "work")
+    finally:
+        request_id.reset(token)
+    logging.getLogger("fitnessapp").debug("not emitted")
+
+    (entry,) = log_output()
+    assert entry["message"] == "Failed to do work"
+    assert entry["request_id"] == "req-1"
+    assert "ValueError: boom" in entry["exception"]
+
+
+@pytest.mark.asyncio
+async def test_tc086_request_id_header_and_access_log(client, mock_conn, log_output):
+    """TC-086: Requests carry an id, errors are logged with it and not leaked to the client"""
+    token = create_access_token(data={"sub": "1"})
+    mock_conn.fetchrow.side_effect = RuntimeError("password=hunter2")
+
+    response = await client.get(
+        "/api/user/stats",
+        headers={"Authorization": f"Bearer {token}", "X-Request-ID": "trace-42"},
+    )
+
+    assert response.status_code == 500
+    assert response.headers["x-request-id"] == "trace-42"
+    assert "hunter2" not in response.text
+
+    error, access = [entry for entry in log_output() if entry["logger"].startswith("fitnessapp")]
+    assert error["request_id"] == access["request_id"] == "trace-42"
+    assert "hunter2" in error["exception"]
+    assert access["route"] == "/api/user/stats"
+    assert access["status"] == 500
+
+    response = await client.get("/health/live")
+    assert len(response.headers["x-request-id"]) == 32
@@ -1,6 +1,7 @@
+import time
 import pytest
 from fastapi import HTTPException
-from auth import create_access_token
+from auth import create_access_token, token_cache, TokenCache
 import main
 
 
@@ -42,3 +43,65 @@ def test_tc057_map_body_goal_variants():
     assert main._map_body_goal("Gain mass") == "Muscle Gain"
     assert main._map_body_goal("Stay healthy") == "General Fitness"
     assert main._map_body_goal("unknown goal") == "General Fitness"
+
+
+@pytest.mark.asyncio
+async def test_tc057b_get_current_user_id_uses_token_cache():
+    """TC-057b: A verified token is served from the cache on repeat requests"""
+    token = create_access_token(data={"sub": "7"})
+    authorization = f"Bearer {token}"
+    token_cache.clear()
+    hits_before = token_cache.hits
+
+    assert await main.get_current_user_id(authorization=authorization) == 7
+    assert await main.get_current_user_id(authorization=authorization) == 7
+
+    assert token_cache.hits == hits_before + 1
+    assert token_cache.stats()["size"] == 1
+
+
+def test_tc057c_token_cache_evicts_expired_and_least_recent():
+    """TC-057c: Cached tokens expire at exp and the cache stays bounded"""
+    cache = TokenCache(max_size=2)
+    cache.put("expired", 1, time.time() - 1)
+    assert cache.get("expired") is None
+    assert cache.expirations == 1
+
+    cache.put("a", 1, time.time() + 60)
+    cache.put("b", 2, time.time() + 60)
+    assert cache.get("a") == 1
+    cache.put("c", 3, time.time() + 60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_tc081_liveness_does_not_touch_database(client, mock_db_pool):
+    """TC-081: /health/live answers without acquiring a connection"""
+    response = await client.get("/health/live")
+
+    assert response.status_code == 200
+    mock_db_pool.acquire.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_tc082_readiness_pings_database(client, mock_conn, monkeypatch):
+    """TC-082: /health/ready is 503 until startup finishes, then checks the database"""
+    monkeypatch.setattr(main.app.state, "ready", False, raising=False)
+    response = await client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+
+    main.app.state.ready = True
+    mock_conn.fetchval.return_value = 1
+    response = await client.get("/health/ready")
+    assert response.status_code == 200
+    mock_conn.fetchval.assert_awaited_with("SELECT 1")
+
+    mock_conn.fetchval.side_effect = OSError("connection refused")
+    response = await client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "database unavailable"
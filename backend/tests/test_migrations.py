@@ -0,0 +1,127 @@
+import asyncpg
+import pytest
+
+import migrate
+from migrate import MIGRATION_LOCK_KEY, NO_TRANSACTION_MARKER, load_migrations, run_migrations, split_statements
+
+
+@pytest.fixture
+def migrations_dir(tmp_path):
+    (tmp_path / "0002_second.sql").write_text("CREATE TABLE b (id INT);")
+    (tmp_path / "0001_first.sql").write_text("CREATE TABLE a (id INT);")
+    return tmp_path
+
+
+def test_load_migrations_sorted_by_version(migrations_dir):
+    """Migration files are discovered and ordered by their numeric prefix"""
+    migrations = load_migrations(migrations_dir)
+
+    assert [(version, name) for version, name, _ in migrations] == [(1, "first"), (2, "second")]
+
+
+def test_load_migrations_rejects_duplicates(migrations_dir):
+    """Two files with the same version are a configuration error"""
+    (migrations_dir / "0002_other.sql").write_text("SELECT 1;")
+
+    with pytest.raises(ValueError):
+        load_migrations(migrations_dir)
+
+
+def test_repo_migrations_are_well_formed():
+    """The shipped migrations load and start at the baseline"""
+    migrations = load_migrations()
+
+    assert migrations[0][:2] == (1, "baseline")
+
+
+def test_repo_index_migrations_build_concurrently():
+    """Index-only migrations run outside a transaction and never take a SHARE lock"""
+    for _, _, path in load_migrations():
+        sql = path.read_text()
+        if not sql.startswith(NO_TRANSACTION_MARKER):
+            assert "CONCURRENTLY" not in sql, path.name
+            continue
+        statements = split_statements(sql)
+        assert statements, path.name
+        assert all(s.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS") for s in statements), path.name
+
+
+@pytest.mark.asyncio
+async def test_up_to_date_database_is_a_single_query(mock_conn, migrations_dir):
+    """Startup against a migrated database only checks the version"""
+    mock_conn.fetchval.return_value = 2
+
+    applied = await run_migrations(mock_conn, load_migrations(migrations_dir))
+
+    assert applied == []
+    assert mock_conn.fetchval.await_count == 1
+    mock_conn.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_pending_migrations_applied_under_lock(mock_conn, migrations_dir):
+    """Only migrations missing from schema_version run, each in a transaction"""
+    mock_conn.fetchval.return_value = 1
+    mock_conn.fetch.return_value = [{"version": 1}]
+
+    applied = await run_migrations(mock_conn, load_migrations(migrations_dir))
+
+    assert applied == [2]
+    statements = [call.args[0] for call in mock_conn.execute.await_args_list]
+    assert statements[0] == "SELECT pg_advisory_lock($1)"
+    assert "CREATE TABLE b (id INT);" in statements
+    assert "CREATE TABLE a (id INT);" not in statements
+    assert statements[-1] == "SELECT pg_advisory_unlock($1)"
+    assert mock_conn.execute.await_args_list[-1].args[1] == MIGRATION_LOCK_KEY
+    mock_conn.transaction.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_lock_released_when_migration_fails(mock_conn, migrations_dir):
+    """A failing migration still releases the advisory lock"""
+    mock_conn.fetchval.return_value = 0
+    mock_conn.fetch.return_value = []
+
+    async def execute(query, *args):
+        if query.startswith("CREATE TABLE a"):
+            raise RuntimeError("boom")
+
+    mock_conn.execute.side_effect = execute
+
+    with pytest.raises(RuntimeError):
+        await run_migrations(mock_conn, load_migrations(migrations_dir))
+
+    assert mock_conn.execute.await_args_list[-1].args[0] == "SELECT pg_advisory_unlock($1)"
+
+
+@pytest.mark.asyncio
+async def test_fresh_database_reports_version_zero(mock_conn):
+    """A database without schema_version is treated as version 0"""
+    mock_conn.fetchval.side_effect = asyncpg.UndefinedTableError("relation does not exist")
+
+    assert await migrate.current_version(mock_conn) == 0
+
+
+@pytest.mark.asyncio
+async def test_no_transaction_migration_runs_statement_by_statement(mock_conn, tmp_path):
+    """A -- no-transaction file runs each statement alone, after dropping invalid leftovers"""
+    (tmp_path / "0001_indexes.sql").write_text(
+        "-- no-transaction\n-- two indexes\n"
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a ON a (id);\n"
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_b ON b (id);\n"
+    )
+    mock_conn.fetchval.return_value = 0
+    mock_conn.fetch.side_effect = [[], [{"relname": "idx_b"}]]
+
+    applied = await run_migrations(mock_conn, load_migrations(tmp_path))
+
+    assert applied == [1]
+    assert mock_conn.fetch.await_args.args[1] == ["idx_a", "idx_b"]
+    statements = [call.args[0] for call in mock_conn.execute.await_args_list]
+    assert statements[2:5] == [
+        'DROP INDEX CONCURRENTLY IF EXISTS "idx_b"',
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a ON a (id)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_b ON b (id)",
+    ]
+    assert statements[5].startswith("INSERT INTO schema_version")
+    mock_conn.transaction.assert_not_called()
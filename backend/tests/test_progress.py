@@ -81,3 +81,171 @@ async def test_tc036_get_exercise_progress_multiple_exercises(client, mock_conn)
     assert "Deadlift" in data
     assert len(data["Squat"]) == 2
     assert len(data["Deadlift"]) == 1
+
+@pytest.mark.asyncio
+async def test_tc036b_progress_and_volume_read_rollup_with_range(client, mock_conn):
+    """TC-036b: Chart endpoints read the daily rollup and pass the from/to range"""
+    token = create_access_token(data={"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+    mock_conn.fetch.return_value = [{"date": "2024-05-10", "total_kg": 1500.0}]
+
+    response = await client.get("/api/user/workout-volume?from=2024-05-01&to=2024-05-31", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": 1, "date": "2024-05-10", "total_kg": 1500.0}]
+    query, *args = mock_conn.fetch.await_args.args
+    assert "training_daily_rollup" in query
+    assert [str(a) for a in args] == ["1", "2024-05-01", "2024-05-31"]
+
+    mock_conn.fetch.return_value = []
+    response = await client.get("/api/user/exercises-progress?from=2024-05-01", headers=headers)
+
+    assert response.status_code == 200
+    query, *args = mock_conn.fetch.await_args.args
+    assert "training_daily_rollup" in query
+    assert args[2] is None
+
+@pytest.mark.asyncio
+async def test_tc091_exercise_chart_is_one_rollup_aggregate(client, mock_conn):
+    """TC-091: /chart/<series>/<exercise> returns [date, value] points from one rollup query"""
+    token = create_access_token(data={"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+    mock_conn.fetch.return_value = [{"date": "2024-05-10", "value": 1500.0}, {"date": "2024-05-12", "value": 1612.456}]
+
+    response = await client.get("/chart/strength-total/Bench Press?from=2024-05-01", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == [["2024-05-10", 1500.0], ["2024-05-12", 1612.46]]
+    assert mock_conn.fetch.await_count == 1
+    query, *args = mock_conn.fetch.await_args.args
+    assert "training_daily_rollup" in query and "SUM(r.volume_kg)" in query
+    assert [str(a) for a in args] == ["1", "Bench Press", "2024-05-01", "None"]
+
+    mock_conn.fetch.return_value = []
+    response = await client.get("/chart/daily-cardio-calories?to=2024-05-31", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == []
+    query, *args = mock_conn.fetch.await_args.args
+    assert "exer_met" in query and "'cardio'" in query
+    assert args[1] is None
+
+@pytest.mark.asyncio
+async def test_tc092_chart_rejects_unknown_series_and_wrong_shape(client, mock_conn):
+    """TC-092: Unknown charts, and exercise arguments a chart doesn't take, are 404s"""
+    token = create_access_token(data={"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for url in ("/chart/nope", "/chart/cardio-speed", "/chart/total-volume/Squat"):
+        response = await client.get(url, headers=headers)
+        assert response.status_code == 404, url
+    assert mock_conn.fetch.await_count == 0
+
+    response = await client.get("/chart/total-volume")
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_tc093_dashboard_skips_hidden_charts(client, mock_conn):
+    """TC-093: The dashboard returns every visible chart, and progress per exercise, in one response"""
+    token = create_access_token(data={"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def fetch(query, *args):
+        if "user_hidden_charts" in query:
+            return [{"chart_name": "cardio speed", "option": "Rowing"}, {"chart_name": "Progress", "option": "Bench"}]
+        if "max_kg" in query:
+            return [{"exer_name": "Bench", "date": "2024-05-10", "max_kg": 60.0},
+                    {"exer_name": "Squat", "date": "2024-05-10", "max_kg": 90.0}]
+        return [{"date": "2024-05-10", "value": 4500.0}]
+    mock_conn.fetch.side_effect = fetch
+
+    response = await client.post(
+        "/api/charts/dashboard?from=2024-05-01",
+        headers=headers,
+        json={
+            "charts": [
+                {"chart": "cardio speed", "measure": "Rowing"},
+                {"chart": "total weight lifted", "measure": "Squat"},
+                {"chart": "track calories", "measure": "just intake"},
+                {"chart": "track calories", "measure": "just cardio"},
+            ],
+            "progress": True,
+        },
+    )
+
+    assert response.status_code == 200
+    charts = {(c["chart"], c["measure"]): c for c in response.json()["charts"]}
+    assert list(charts) == [
+        ("total weight lifted", "Squat"),
+        ("track calories", "just intake"),
+        ("track calories", "just cardio"),
+        ("Progress", "Squat"),
+    ]
+    assert charts[("total weight lifted", "Squat")]["points"] == [["2024-05-10", 4500.0]]
+    assert charts[("track calories", "just intake")]["points"] is None
+    assert charts[("track calories", "just cardio")]["series"] == "daily-cardio-calories"
+    assert charts[("Progress", "Squat")]["points"] == [["2024-05-10", 90.0]]
+    # Hidden list, two series and the progress query
+    assert mock_conn.fetch.await_count == 4
+
+@pytest.mark.asyncio
+async def test_tc094_dashboard_series_run_concurrently(monkeypatch):
+    """TC-094: Dashboard series use separate connections, at most DASHBOARD_CONCURRENCY at once"""
+    import asyncio
+    from contextlib import asynccontextmanager
+    import charts
+
+    class Pool:
+        active = peak = acquired = 0
+
+        @asynccontextmanager
+        async def acquire(self):
+            Pool.active += 1
+            Pool.acquired += 1
+            Pool.peak = max(Pool.peak, Pool.active)
+            try:
+                yield self
+            finally:
+                Pool.active -= 1
+
+        async def fetch(self, query, *args):
+            await asyncio.sleep(0.01)
+            return []
+
+    monkeypatch.setattr(charts, "DASHBOARD_CONCURRENCY", 3)
+    pairs = [("total weight lifted", f"exercise {i}") for i in range(6)]
+
+    result = await charts.dashboard(Pool(), 1, pairs)
+
+    assert [entry["points"] for entry in result] == [[]] * 6
+    assert Pool.acquired == 7
+    assert Pool.peak == 3
+
+@pytest.mark.asyncio
+async def test_tc095_calories_burned_per_week(client, mock_conn):
+    """TC-095: Calories burned come from one MET aggregate, scaled by body weight"""
+    token = create_access_token(data={"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+    mock_conn.fetch.return_value = [
+        {"date": "2024-05-06", "cardio": 0.5, "strength": 0.2, "body_weight": 80.0},
+        {"date": "2024-05-13", "cardio": None, "strength": 1.0, "body_weight": 80.0},
+    ]
+
+    response = await client.get("/api/user/calories-burned?period=week&from=2024-05-01", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"date": "2024-05-06", "cardio_kcal": 40.0, "strength_kcal": 16.0, "total_kcal": 56.0},
+        {"date": "2024-05-13", "cardio_kcal": 0.0, "strength_kcal": 80.0, "total_kcal": 80.0},
+    ]
+    assert mock_conn.fetch.await_count == 1
+    query, *args = mock_conn.fetch.await_args.args
+    assert "training_daily_rollup" in query and "r.cardio_minutes <= 0" in query
+    assert [str(a) for a in args] == ["1", "week", "2024-05-01", "None"]
+
+    mock_conn.fetch.return_value = [{"date": "2024-05-06", "cardio": 0.5, "strength": 0.0, "body_weight": None}]
+    response = await client.get("/api/user/calories-burned", headers=headers)
+    assert response.json() == []
+
+    response = await client.get("/api/user/calories-burned?period=month", headers=headers)
+    assert response.status_code == 422
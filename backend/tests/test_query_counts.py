@@ -0,0 +1,212 @@
+"""Query-count regression tests against a real PostgreSQL database.
+
+The unit tests mock every query, so an endpoint that starts issuing one
+statement per set, per event or per row still passes them. These tests run
+the endpoints against a real database, count the statements each request
+executes for a small and a large payload (or history), and fail if the count
+grows with the input size.
+
+They use the ``postgres_dsn`` fixture: TEST_DATABASE_URL if set, otherwise a
+throwaway cluster started with the local PostgreSQL binaries; without either
+they are skipped. Everything lives in a ``query_count`` schema.
+"""
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import asyncpg
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+import main
+from auth import create_access_token
+from migrate import run_migrations
+
+SCHEMA = "query_count"
+BASE_SCHEMA_SQL = Path(__file__).resolve().parents[2] / "flutter_app" / "sql" / "create_database"
+SMALL, LARGE = 1, 50
+
+SEED_SQL = """
+INSERT INTO exercise (exer_name, exer_body_area, exer_type, exer_equip, exer_met)
+SELECT 'exercise ' || g, 'legs',
+       (CASE WHEN g % 5 = 0 THEN 'cardio' ELSE 'strength' END)::focus,
+       'Dumbbells', 5
+FROM generate_series(1, 60) g;
+"""
+
+_emails = itertools.count()
+
+
+async def _build_schema(dsn):
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        await conn.execute(f"SET search_path TO {SCHEMA}")
+        await conn.execute(BASE_SCHEMA_SQL.read_text().replace("SET search_path TO public;", ""))
+        await run_migrations(conn)
+        await conn.execute(SEED_SQL)
+    finally:
+        await conn.close()
+
+
+async def _drop_schema(dsn):
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    finally:
+        await conn.close()
+
+
+@pytest.fixture(scope="module")
+def count_database(postgres_dsn):
+    asyncio.run(_build_schema(postgres_dsn))
+    yield postgres_dsn
+    asyncio.run(_drop_schema(postgres_dsn))
+
+
+class CountingPool:
+    """Single-connection pool that records every statement the app executes"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.statements = []
+        conn.add_query_logger(lambda record: self.statements.append(" ".join(record.query.split())))
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@pytest.fixture
+async def api(count_database):
+    conn = await asyncpg.connect(count_database, server_settings={"search_path": SCHEMA})
+    pool = CountingPool(conn)
+    main.app.state.db_pool = pool
+    main.leaderboards.reset()
+    try:
+        async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as client:
+            yield client, pool
+    finally:
+        await conn.close()
+
+
+async def _new_user(conn) -> tuple[int, dict]:
+    n = next(_emails)
+    user_id = await conn.fetchval(
+        "INSERT INTO users (user_name, user_email, user_password) VALUES ($1, $2, 'x') RETURNING user_id",
+        f"count{n}",
+        f"count{n}@query.test",
+    )
+    await conn.execute(
+        "INSERT INTO body_metrics (user_id, body_weight, body_height, body_age, body_gender, body_goal) "
+        "VALUES ($1, 80, 180, 30, 'male', 'General Fitness')",
+        user_id,
+    )
+    return user_id, {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+
+
+def _workout(exercises: int, sets: int) -> dict:
+    return {
+        "duration_minutes": 45,
+        "exercises": [
+            {"exer_id": 1 + i % 60, "exer_name": f"exercise {1 + i % 60}",
+             "sets": [{"reps": 10, "kg": 50, "time": 5, "distance": 1.5}] * sets}
+            for i in range(exercises)
+        ],
+    }
+
+
+async def _count(client, pool, method, url, headers, **kwargs) -> list[str]:
+    pool.statements.clear()
+    response = await client.request(method, url, headers=headers, **kwargs)
+    assert response.status_code == 200, (method, url, response.text)
+    # asyncpg calls query loggers with call_soon
+    await asyncio.sleep(0)
+    return list(pool.statements)
+
+
+def _assert_constant(name: str, small: list[str], large: list[str]):
+    assert len(small) == len(large), (
+        f"{name}: {len(small)} statements for {SMALL}, {len(large)} for {LARGE}\n"
+        + "\n".join(query[:150] for query in large)
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("shape", ["sets", "exercises"])
+async def test_save_workout_statements_do_not_grow(api, shape):
+    """Saving a workout costs the same number of statements for 1 or 50 sets/exercises"""
+    client, pool = api
+    counts = []
+    for n in (SMALL, LARGE):
+        _, headers = await _new_user(pool.conn)
+        body = _workout(exercises=1, sets=n) if shape == "sets" else _workout(exercises=n, sets=1)
+        counts.append(await _count(client, pool, "POST", "/api/workouts", headers, json=body))
+    _assert_constant(f"POST /api/workouts ({shape})", *counts)
+
+
+@pytest.mark.asyncio
+async def test_workout_history_statements_do_not_grow(api):
+    """Workout list, detail and delete don't issue a query per workout or per exercise"""
+    client, pool = api
+    counts = {}
+    for n in (SMALL, LARGE):
+        _, headers = await _new_user(pool.conn)
+        for _ in range(n):
+            response = await client.post("/api/workouts", headers=headers, json=_workout(exercises=3, sets=3))
+            workout_id = response.json()["workout_id"]
+        big_id = (await client.post("/api/workouts", headers=headers, json=_workout(exercises=n, sets=2))).json()["workout_id"]
+
+        for method, url in (
+            ("GET", "/api/workouts?limit=100"),
+            ("GET", f"/api/workouts/{big_id}"),
+            ("GET", "/api/user/workout-volume"),
+            ("GET", "/api/user/exercises-progress"),
+            ("DELETE", f"/api/workouts/{big_id}"),
+            ("DELETE", f"/api/workouts/{workout_id}"),
+        ):
+            key = (method, url.replace(str(big_id), "{big}").replace(str(workout_id), "{last}"))
+            counts.setdefault(key, []).append(await _count(client, pool, method, url, headers))
+
+    for (method, url), (small, large) in counts.items():
+        _assert_constant(f"{method} {url}", small, large)
+
+
+@pytest.mark.asyncio
+async def test_xp_batch_statements_do_not_grow(api):
+    """A batch of XP events is one insert regardless of its size"""
+    client, pool = api
+    counts = []
+    for n in (SMALL, LARGE):
+        _, headers = await _new_user(pool.conn)
+        body = {"events": [{"amount": 5, "source": "set"}] * n}
+        counts.append(await _count(client, pool, "POST", "/api/user/stats/xp/batch", headers, json=body))
+    _assert_constant("POST /api/user/stats/xp/batch", *counts)
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_statements_do_not_grow(api):
+    """The leaderboard fetches every listed username in one query"""
+    client, pool = api
+    counts = []
+    for n in (SMALL, LARGE):
+        _, headers = await _new_user(pool.conn)
+        await pool.conn.execute(
+            """
+            WITH ranked AS (
+                INSERT INTO users (user_name, user_email, user_password)
+                SELECT 'ranked' || g, 'ranked' || $2 || '_' || g || '@query.test', 'x'
+                FROM generate_series(1, $1) g
+                RETURNING user_id
+            )
+            INSERT INTO user_stats (user_id, xp, level)
+            SELECT user_id, 1000 + user_id, 1 FROM ranked
+            """,
+            n,
+            str(next(_emails)),
+        )
+        main.leaderboards.reset()
+        counts.append(await _count(client, pool, "GET", f"/api/leaderboard/xp?limit={LARGE}", headers))
+    _assert_constant("GET /api/leaderboard/xp", *counts)
@@ -0,0 +1,249 @@
+"""EXPLAIN-based regression tests for the hot endpoint queries.
+
+These run the real endpoints against a seeded PostgreSQL database and EXPLAIN
+every statement they issue, failing if any of them falls back to a sequential
+scan on one of the large per-user tables.
+
+They use the ``postgres_dsn`` fixture: TEST_DATABASE_URL if set, otherwise a
+throwaway cluster started with the local PostgreSQL binaries; without either
+they are skipped.
+
+Everything is created inside a throwaway ``plan_check`` schema. The amount of
+seeded training data is controlled by TEST_PLAN_TRAINING_ROWS (default 2M).
+"""
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import asyncpg
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+import main
+from auth import create_access_token
+from migrate import run_migrations
+
+TRAINING_ROWS = int(os.getenv("TEST_PLAN_TRAINING_ROWS", "2000000"))
+USERS = 2000
+SCHEMA = "plan_check"
+BASE_SCHEMA_SQL = Path(__file__).resolve().parents[2] / "flutter_app" / "sql" / "create_database"
+
+# Tables that grow with users/history and must never be scanned in full
+LARGE_TABLES = {
+    "training",
+    "training_exercise",
+    "training_body",
+    "user_workout",
+    "user_workout_exercise",
+    "body_metrics",
+    "user_tasks",
+    "plan_exercise",
+    "training_daily_rollup",
+}
+
+SEED_SQL = f"""
+INSERT INTO users (user_name, user_email, user_password)
+SELECT 'user' || g, 'user' || g || '@plan.test', 'x'
+FROM generate_series(1, {USERS}) g;
+
+CREATE TEMP TABLE seeded AS
+SELECT MIN(user_id) AS first_id, COUNT(*) AS n
+FROM users WHERE user_email LIKE '%@plan.test';
+
+INSERT INTO body_metrics (user_id, body_weight, body_height, body_age, body_gender, body_goal)
+SELECT user_id, 70 + user_id % 30, 175, 30, 'male', 'General Fitness'
+FROM users WHERE user_email LIKE '%@plan.test';
+
+INSERT INTO user_fitness_profile (user_id, days_per_week_goal)
+SELECT user_id, 3 FROM users WHERE user_email LIKE '%@plan.test';
+
+INSERT INTO user_streak (user_id, current_streak, longest_streak, week_start_date)
+SELECT user_id, 0, 0, CURRENT_DATE FROM users WHERE user_email LIKE '%@plan.test';
+
+INSERT INTO user_stats (user_id, xp, level)
+SELECT user_id, user_id % 1000, 1 FROM users WHERE user_email LIKE '%@plan.test';
+
+INSERT INTO training (user_id, train_data, train_mins, train_reps, train_effort)
+SELECT s.first_id + g % s.n, NOW() - (g % 1000) * INTERVAL '1 day', g % 40, g % 12, g % 100
+FROM seeded s, generate_series(1, {TRAINING_ROWS}) g;
+
+INSERT INTO training_exercise (train_id, exer_id, sets, reps, weight)
+SELECT t.train_id, ex.ids[1 + t.train_id % array_length(ex.ids, 1)], 1 + t.train_id % 4, t.train_reps, t.train_effort
+FROM training t, (SELECT array_agg(exer_id) AS ids FROM exercise) ex;
+
+INSERT INTO training_body (train_id, body_id)
+SELECT t.train_id, bm.body_id
+FROM training t JOIN body_metrics bm ON bm.user_id = t.user_id;
+
+INSERT INTO training_daily_rollup (user_id, day, exer_id, volume_kg, max_weight_kg, total_reps, total_sets)
+SELECT t.user_id, t.train_data::date, te.exer_id, SUM(te.weight * te.reps), MAX(te.weight), SUM(te.reps), COUNT(*)
+FROM training t JOIN training_exercise te ON te.train_id = t.train_id
+GROUP BY 1, 2, 3;
+
+INSERT INTO user_workout (user_id, created_at, duration_minutes, notes)
+SELECT s.first_id + g % s.n, NOW() - g * INTERVAL '1 minute', 45, ''
+FROM seeded s, generate_series(1, {TRAINING_ROWS // 10}) g;
+
+INSERT INTO user_workout_exercise (workout_id, exer_id, sets, reps, weight, notes)
+SELECT w.workout_id, ex.ids[1 + (w.workout_id + k) % array_length(ex.ids, 1)], 3, 10, 50, ''
+FROM user_workout w, generate_series(1, 3) k, (SELECT array_agg(exer_id) AS ids FROM exercise) ex;
+
+INSERT INTO user_tasks (user_id, name, goal)
+SELECT s.first_id + g % s.n, 'task ' || g, 'General Fitness'
+FROM seeded s, generate_series(1, {USERS * 10}) g;
+
+INSERT INTO plan_exercise (exer_id, plan_exer_amount, plan_exer_set, plan_exer_PB)
+SELECT ex.ids[1 + g % array_length(ex.ids, 1)], 10, 3, g % 100
+FROM generate_series(1, {USERS * 50}) g, (SELECT array_agg(exer_id) AS ids FROM exercise) ex;
+
+ANALYZE;
+"""
+
+
+async def _build_schema(dsn):
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        await conn.execute(f"SET search_path TO {SCHEMA}")
+        base_sql = BASE_SCHEMA_SQL.read_text().replace("SET search_path TO public;", "")
+        await conn.execute(base_sql)
+        await run_migrations(conn)
+        await conn.execute(SEED_SQL)
+    finally:
+        await conn.close()
+
+
+async def _drop_schema(dsn):
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    finally:
+        await conn.close()
+
+
+@pytest.fixture(scope="module")
+def seeded_database(postgres_dsn):
+    asyncio.run(_build_schema(postgres_dsn))
+    yield postgres_dsn
+    asyncio.run(_drop_schema(postgres_dsn))
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    """Relation names of every Seq Scan node in an EXPLAIN (FORMAT JSON) plan"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+class ExplainingConnection:
+    """Connection proxy that EXPLAINs each statement before running it"""
+
+    def __init__(self, conn, plans):
+        self._conn = conn
+        self._plans = plans
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    async def _explain(self, query, args):
+        plan_json = await self._conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *args)
+        plan = json.loads(plan_json) if isinstance(plan_json, str) else plan_json
+        self._plans.append((" ".join(query.split()), plan[0]["Plan"]))
+
+    async def fetch(self, query, *args):
+        await self._explain(query, args)
+        return await self._conn.fetch(query, *args)
+
+    async def fetchrow(self, query, *args):
+        await self._explain(query, args)
+        return await self._conn.fetchrow(query, *args)
+
+    async def fetchval(self, query, *args):
+        await self._explain(query, args)
+        return await self._conn.fetchval(query, *args)
+
+    async def execute(self, query, *args):
+        await self._explain(query, args)
+        return await self._conn.execute(query, *args)
+
+
+class ExplainingPool:
+    def __init__(self, conn):
+        self.conn = conn
+        self.plans = []
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield ExplainingConnection(self.conn, self.plans)
+
+
+@pytest.fixture
+async def explain_pool(seeded_database):
+    conn = await asyncpg.connect(seeded_database, server_settings={"search_path": SCHEMA})
+    pool = ExplainingPool(conn)
+    main.app.state.db_pool = pool
+    try:
+        yield pool
+    finally:
+        await conn.close()
+
+
+async def _user_context(conn):
+    user_id = await conn.fetchval(
+        "SELECT MIN(user_id) + 7 FROM users WHERE user_email LIKE '%@plan.test'"
+    )
+    workout = await conn.fetchrow(
+        "SELECT workout_id, created_at FROM user_workout WHERE user_id = $1 ORDER BY created_at DESC LIMIT 1",
+        user_id,
+    )
+    task_id = await conn.fetchval("SELECT id FROM user_tasks WHERE user_id = $1 LIMIT 1", user_id)
+    return user_id, workout, task_id
+
+
+@pytest.mark.asyncio
+async def test_hot_endpoints_use_indexes(explain_pool):
+    """Every statement issued by the hot endpoints avoids seq scans on large tables"""
+    user_id, workout, task_id = await _user_context(explain_pool.conn)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+    cursor = f"{workout['created_at']},{workout['workout_id']}"
+    exercise = await explain_pool.conn.fetchval("SELECT exer_name FROM exercise ORDER BY exer_id LIMIT 1")
+
+    requests = [
+        ("GET", "/api/workouts"),
+        ("GET", f"/api/workouts?before={cursor}"),
+        ("GET", f"/api/workouts/{workout['workout_id']}"),
+        ("GET", "/api/user/workout-volume"),
+        ("GET", "/api/user/exercises-progress"),
+        ("GET", "/api/charts/options"),
+        ("GET", "/chart/total-volume"),
+        ("GET", "/chart/daily-cardio-calories?from=2024-01-01"),
+        ("GET", f"/chart/strength-total/{exercise}"),
+        ("GET", f"/chart/cardio-speed/{exercise}"),
+        ("GET", "/chart/daily-calories"),
+        ("GET", "/api/user/calories-burned?period=week"),
+        ("GET", "/api/users/profile"),
+        ("GET", "/api/users/questionnaire"),
+        ("GET", "/api/streak"),
+        ("GET", "/api/user/stats"),
+        ("POST", f"/api/user/tasks/{task_id}/complete"),
+        ("DELETE", f"/api/workouts/{workout['workout_id']}"),
+    ]
+
+    failures = []
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as client:
+        for method, url in requests:
+            explain_pool.plans.clear()
+            response = await client.request(method, url, headers=headers)
+            assert response.status_code == 200, (url, response.text)
+            for query, plan in explain_pool.plans:
+                scanned = LARGE_TABLES.intersection(_seq_scans(plan))
+                if scanned:
+                    failures.append(f"{method} {url}: seq scan on {sorted(scanned)} in: {query[:120]}")
+
+    assert not failures, "\n".join(failures)
@@ -62,7 +62,7 @@ async def test_tc065_add_user_xp_no_levelup(client, mock_conn):
     token = create_access_token(data={"sub": "1"})
     headers = {"Authorization": f"Bearer {token}"}
     
-    mock_conn.fetchrow.return_value = {"xp": 100, "level": 2}
+    mock_conn.fetchrow.return_value = {"xp": 150, "level": 2}
     
     response = await client.post("/api/user/stats/xp", json={"amount": 50}, headers=headers)
     assert response.status_code == 200
@@ -78,7 +78,7 @@ async def test_tc066_add_user_xp_with_levelup(client, mock_conn):
     token = create_access_token(data={"sub": "1"})
     headers = {"Authorization": f"Bearer {token}"}
     
-    mock_conn.fetchrow.return_value = {"xp": 90, "level": 1}
+    mock_conn.fetchrow.return_value = {"xp": 110, "level": 2}
     
     response = await client.post("/api/user/stats/xp", json={"amount": 20}, headers=headers)
     assert response.status_code == 200
@@ -87,3 +87,99 @@ async def test_tc066_add_user_xp_with_levelup(client, mock_conn):
     assert data["xp"] == 110
     assert data["level"] == 2
     assert data["leveled_up"] is True
+
+@pytest.mark.asyncio
+async def test_tc059b_update_streak_single_statement(client, mock_conn):
+    """TC-059b: The streak transition is one upsert; a repeat on the same day is a no-op"""
+    token = create_access_token(data={"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    mock_conn.fetchrow.side_effect = [{
+        "current_streak": 6,
+        "longest_streak": 10,
+        "streak_start_date": None,
+        "last_workout_date": None,
+        "workouts_this_week": 3,
+        "week_start_date": None,
+    }]
+    mock_conn.fetchval.return_value = 3
+
+    response = await client.post("/api/streak/update", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["goal_met"] is True
+    query = mock_conn.fetchrow.await_args.args[0]
+    assert "ON CONFLICT (user_id) DO UPDATE" in query
+    mock_conn.execute.assert_not_awaited()
+
+    mock_conn.fetchrow.side_effect = [None, {"current_streak": 6, "workouts_this_week": 3}]
+    response = await client.post("/api/streak/update", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["message"] == "Already worked out today"
+
+@pytest.mark.asyncio
+async def test_tc066b_add_user_xp_appends_ledger_event(client, mock_conn):
+    """TC-066b: A grant is one insert into the XP ledger, never a write-back of a value read earlier"""
+    token = create_access_token(data={"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    mock_conn.fetchrow.return_value = {"xp": 110, "level": 2}
+
+    response = await client.post("/api/user/stats/xp", json={"amount": 20, "source": "quest"}, headers=headers)
+
+    assert response.status_code == 200
+    assert mock_conn.fetchrow.await_count == 1
+    query, user_id, amounts, sources = mock_conn.fetchrow.await_args.args
+    assert "INSERT INTO xp_event" in query
+    assert (user_id, amounts, sources) == (1, [20], ["quest"])
+    mock_conn.execute.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_tc066c_add_user_xp_batch(client, mock_conn):
+    """TC-066c: A batch of XP events is written with a single statement"""
+    token = create_access_token(data={"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    mock_conn.fetchrow.return_value = {"xp": 235, "level": 3}
+
+    response = await client.post(
+        "/api/user/stats/xp/batch",
+        json={"events": [{"amount": 50}, {"amount": 25}, {"amount": 60}]},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["events_applied"] == 3
+    assert data["leveled_up"] is True
+    assert mock_conn.fetchrow.await_args.args[2] == [50, 25, 60]
+    assert mock_conn.fetchrow.await_args.args[3] == ["manual"] * 3
+
+    response = await client.post("/api/user/stats/xp/batch", json={"events": []}, headers=headers)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_tc066e_add_user_xp_rejects_bad_grants(client, mock_conn):
+    """TC-066e: Non-positive amounts and the reserved opening_balance source are rejected"""
+    token = create_access_token(data={"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for body in ({"amount": 0}, {"amount": -50}, {"amount": 10, "source": "opening_balance"}):
+        response = await client.post("/api/user/stats/xp", json=body, headers=headers)
+        assert response.status_code == 422
+        response = await client.post("/api/user/stats/xp/batch", json={"events": [body]}, headers=headers)
+        assert response.status_code == 422
+
+    mock_conn.fetchrow.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_tc066d_compactor_loops_until_backlog_drained(mock_conn):
+    """TC-066d: Compaction keeps folding full batches until a partial one"""
+    from xp import compact_xp_events
+
+    mock_conn.fetchrow.side_effect = [{"events": 100, "users": 7}, {"events": 100, "users": 3}, {"events": 12, "users": 1}]
+
+    assert await compact_xp_events(mock_conn, batch_size=100) == 212
+    assert mock_conn.fetchrow.await_count == 3
+    assert "FOR UPDATE SKIP LOCKED" in mock_conn.fetchrow.await_args.args[0]
@@ -1,4 +1,5 @@
 import pytest
+from datetime import datetime
 from auth import create_access_token
 from unittest.mock import AsyncMock, MagicMock
 
@@ -12,10 +13,10 @@ async def test_tc026_log_valid_workout(client, mock_conn):
     
     mock_conn.fetchrow.side_effect = [
         {"workout_id": 100}, 
-        {"train_id": 1},
         {"current_streak": 1, "longest_streak": 1, "streak_start_date": None, "last_workout_date": None, "workouts_this_week": 0, "week_start_date": None}
     ]
-    mock_conn.fetchval.side_effect = [1, "strength"]
+    mock_conn.fetchval.side_effect = [1]
+    mock_conn.fetch.return_value = [{"exer_id": 1, "exer_type": "strength"}]
     
     response = await client.post(
         "/api/workouts",
@@ -39,6 +40,51 @@ async def test_tc026_log_valid_workout(client, mock_conn):
     assert response.status_code == 200
     data = response.json()
     assert data["workout_id"] == 100
+    mock_conn.transaction.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_tc026b_log_workout_round_trips_flat_in_sets(client, mock_conn):
+    """TC-026b: Saving more sets must not issue more queries"""
+    token = create_access_token(data={"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+    streak_row = {"current_streak": 1, "longest_streak": 1, "streak_start_date": None, "last_workout_date": None, "workouts_this_week": 0, "week_start_date": None}
+
+    async def save(exercise_count, sets_per_exercise):
+        mock_conn.reset_mock()
+        mock_conn.fetchrow.side_effect = [{"workout_id": 100}, streak_row]
+        mock_conn.fetchval.side_effect = [1]
+        mock_conn.fetch.return_value = [
+            {"exer_id": i, "exer_type": "cardio" if i % 2 else "strength"} for i in range(exercise_count)
+        ]
+        response = await client.post(
+            "/api/workouts",
+            headers=headers,
+            json={
+                "exercises": [
+                    {
+                        "exer_id": i,
+                        "exer_name": f"Exercise {i}",
+                        "sets": [{"reps": 10, "kg": 50, "time": 5, "distance": 1.2}] * sets_per_exercise,
+                    }
+                    for i in range(exercise_count)
+                ]
+            },
+        )
+        assert response.status_code == 200
+        return (
+            mock_conn.fetchrow.await_count
+            + mock_conn.fetchval.await_count
+            + mock_conn.fetch.await_count
+            + mock_conn.execute.await_count
+        )
+
+    assert await save(1, 1) == await save(10, 5)
+
+    # One training row per set, with cardio sets mapped to minutes/distance
+    training_args = mock_conn.execute.await_args_list[0].args
+    assert len(training_args[2]) == 50
+    assert (training_args[3][0], training_args[3][5]) == (0, 5)
+    assert (training_args[5][0], training_args[5][5]) == (50.0, 1.2)
 
 @pytest.mark.asyncio
 async def test_tc027_log_workout_no_exercises(client, mock_conn):
@@ -81,14 +127,62 @@ async def test_tc029_retrieve_workout_history(client, mock_conn):
     headers = {"Authorization": f"Bearer {token}"}
     
     mock_conn.fetch.side_effect = [
-        [{"workout_id": 1, "created_at": "2024-05-14", "duration_minutes": 60, "notes": ""}],
-        [{"exer_id": 1, "exer_name": "Bench Press", "sets": 3, "reps": 10, "weight": 60, "notes": ""}]
+        [{
+            "workout_id": 1, "created_at": "2024-05-14", "duration_minutes": 60, "notes": "",
+            "exercises": '[{"exer_id": 1, "name": "Bench Press", "sets": 3, "reps": 10, "weight": 60, "notes": ""}]'
+        }]
     ]
     
     response = await client.get("/api/workouts", headers=headers)
     
     assert response.status_code == 200
     assert len(response.json()) > 0
+    assert response.json()[0]["exercises"][0]["name"] == "Bench Press"
+    # History is served by a single aggregated query, with no cursor predicate
+    assert mock_conn.fetch.await_count == 1
+    assert "(w.created_at, w.workout_id) <" not in mock_conn.fetch.await_args.args[0]
+
+@pytest.mark.asyncio
+async def test_tc029b_workout_history_keyset_cursor(client, mock_conn):
+    """TC-029b: Page through workout history with a before cursor"""
+    token = create_access_token(data={"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    mock_conn.fetch.return_value = []
+
+    response = await client.get(
+        "/api/workouts",
+        params={"limit": 20, "before": "2024-05-14 09:30:00.123456,42"},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    args = mock_conn.fetch.await_args.args
+    assert args[1:] == (1, 20, datetime(2024, 5, 14, 9, 30, 0, 123456), 42)
+    assert "AND (w.created_at, w.workout_id) < ($3::timestamp, $4::int)" in args[0]
+
+@pytest.mark.asyncio
+async def test_tc029c_workout_history_invalid_cursor(client, mock_conn):
+    """TC-029c: A malformed before cursor is rejected"""
+    token = create_access_token(data={"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.get("/api/workouts?before=yesterday", headers=headers)
+
+    assert response.status_code == 400
+    mock_conn.fetch.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_tc029d_workout_history_limit_bounded(client, mock_conn):
+    """TC-029d: Page sizes outside 1-100 are rejected"""
+    token = create_access_token(data={"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for limit in (0, 101):
+        response = await client.get("/api/workouts", params={"limit": limit}, headers=headers)
+        assert response.status_code == 422
+
+    mock_conn.fetch.assert_not_awaited()
 
 @pytest.mark.asyncio
 async def test_tc030_access_another_user_workout(client, mock_conn):
@@ -116,3 +210,21 @@ async def test_tc031_delete_own_workout(client, mock_conn):
     
     assert response.status_code == 200
     assert response.json()["message"] == "Workout deleted"
+
+@pytest.mark.asyncio
+async def test_tc031b_delete_workout_refreshes_rollup(client, mock_conn):
+    """TC-031b: Deleting a workout removes its sets and recomputes the days they were on"""
+    token = create_access_token(data={"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    mock_conn.fetchval.side_effect = [1]
+    mock_conn.fetch.return_value = [{"day": datetime(2024, 5, 14).date()}] * 3
+
+    response = await client.delete("/api/workouts/1", headers=headers)
+
+    assert response.status_code == 200
+    assert "DELETE FROM training WHERE workout_id" in mock_conn.fetch.await_args.args[0]
+    refresh_calls = [c.args for c in mock_conn.execute.await_args_list if "training_daily_rollup" in c.args[0]]
+    assert len(refresh_calls) == 3
+    assert "pg_advisory_xact_lock" in refresh_calls[0][0]
+    assert refresh_calls[1][1:] == (1, [datetime(2024, 5, 14).date()])
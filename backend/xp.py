@@ -0,0 +1,149 @@
+"""Experience points and levels for FitnessApp.
+
+Every XP grant is appended to the ``xp_event`` ledger with a plain insert, so
+grants never contend on a shared row. A background compactor periodically
+folds pending events into the running ``user_stats`` total, and reads return
+that compacted total plus whatever is still pending. Because every grant is
+kept, a user's stats (or a whole leaderboard) can be rebuilt from the ledger.
+"""
+import asyncio
+import logging
+import os
+
+XP_PER_LEVEL = 100
+
+# Source of the balances migrated into the ledger; not earned this week, so the
+# weekly board ignores it and clients may not use it
+OPENING_BALANCE_SOURCE = "opening_balance"
+
+# Seconds between compaction passes and events folded per statement
+XP_COMPACT_INTERVAL = float(os.getenv("XP_COMPACT_INTERVAL", "5"))
+XP_COMPACT_BATCH = int(os.getenv("XP_COMPACT_BATCH", "5000"))
+
+logger = logging.getLogger(__name__)
+
+# Compacted total + pending delta for $1 = user_id
+_TOTAL_XP = """
+    COALESCE((SELECT xp FROM user_stats WHERE user_id = $1), 0)
+    + COALESCE((SELECT SUM(amount) FROM xp_event WHERE user_id = $1 AND NOT compacted), 0)
+"""
+
+GET_XP_SQL = f"""
+    SELECT xp, floor(xp / {XP_PER_LEVEL}.0)::int + 1 AS level
+    FROM (SELECT {_TOTAL_XP} AS xp) total
+"""
+
+# $1 = user_id, $2 = amounts, $3 = sources. The inserted rows are not visible
+# to the rest of the statement, so their sum is added explicitly.
+ADD_XP_SQL = f"""
+    WITH added AS (
+        INSERT INTO xp_event (user_id, amount, source)
+        SELECT $1, amount, source
+        FROM unnest($2::int[], $3::text[]) AS e(amount, source)
+        RETURNING amount
+    )
+    SELECT {_TOTAL_XP} + (SELECT COALESCE(SUM(amount), 0) FROM added) AS xp
+"""
+
+# Marks up to $1 pending events as compacted and adds them to user_stats in the
+# same statement; SKIP LOCKED lets compactors in several workers run at once.
+COMPACT_SQL = f"""
+    WITH batch AS (
+        SELECT event_id FROM xp_event
+        WHERE NOT compacted
+        ORDER BY event_id
+        LIMIT $1
+        FOR UPDATE SKIP LOCKED
+    ),
+    moved AS (
+        UPDATE xp_event e SET compacted = TRUE
+        FROM batch
+        WHERE e.event_id = batch.event_id
+        RETURNING e.user_id, e.amount
+    ),
+    totals AS (
+        SELECT user_id, SUM(amount)::int AS amount FROM moved GROUP BY user_id
+    ),
+    applied AS (
+        INSERT INTO user_stats AS s (user_id, xp, level, updated_at)
+        SELECT user_id, amount, floor(amount / {XP_PER_LEVEL}.0)::int + 1, NOW()
+        FROM totals
+        ON CONFLICT (user_id) DO UPDATE SET
+            xp = s.xp + EXCLUDED.xp,
+            level = floor((s.xp + EXCLUDED.xp) / {XP_PER_LEVEL}.0)::int + 1,
+            updated_at = NOW()
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM moved) AS events, (SELECT COUNT(*) FROM applied) AS users
+"""
+
+# Recompute user_stats from the full ledger ($1 = user_id, or NULL for everyone)
+REBUILD_SQL = f"""
+    WITH totals AS (
+        SELECT user_id, SUM(amount)::int AS xp
+        FROM xp_event
+        WHERE $1::int IS NULL OR user_id = $1
+        GROUP BY user_id
+    ),
+    folded AS (
+        UPDATE xp_event SET compacted = TRUE
+        WHERE NOT compacted AND ($1::int IS NULL OR user_id = $1)
+    )
+    INSERT INTO user_stats AS s (user_id, xp, level, updated_at)
+    SELECT user_id, xp, floor(xp / {XP_PER_LEVEL}.0)::int + 1, NOW()
+    FROM totals
+    ON CONFLICT (user_id) DO UPDATE SET
+        xp = EXCLUDED.xp, level = EXCLUDED.level, updated_at = NOW()
+"""
+
+
+def level_for(xp: int) -> int:
+    """Simple level calculation: 100 XP per level"""
+    return xp // XP_PER_LEVEL + 1
+
+
+async def get_xp(connection, user_id: int) -> dict:
+    row = await connection.fetchrow(GET_XP_SQL, user_id)
+    return {"xp": row["xp"], "level": row["level"]}
+
+
+async def add_xp_events(connection, user_id: int, events: list[tuple[int, str]]) -> dict:
+    """Append (amount, source) events to the ledger and return the new totals"""
+    amounts = [amount for amount, _ in events]
+    sources = [source for _, source in events]
+    row = await connection.fetchrow(ADD_XP_SQL, user_id, amounts, sources)
+    xp = row["xp"]
+    level = level_for(xp)
+    return {"xp": xp, "level": level, "leveled_up": level > level_for(xp - sum(amounts))}
+
+
+async def add_xp(connection, user_id: int, amount: int, source: str = "manual") -> dict:
+    return await add_xp_events(connection, user_id, [(amount, source)])
+
+
+async def compact_xp_events(connection, batch_size: int = XP_COMPACT_BATCH) -> int:
+    """Fold pending events into user_stats until none are left; returns events folded"""
+    folded = 0
+    while True:
+        row = await connection.fetchrow(COMPACT_SQL, batch_size)
+        folded += row["events"]
+        if row["events"] < batch_size:
+            return folded
+
+
+async def rebuild_user_stats(connection, user_id: int | None = None):
+    """Recompute user_stats from the ledger for one user, or everyone"""
+    await connection.execute(REBUILD_SQL, user_id)
+
+
+async def run_compactor(pool, interval: float = XP_COMPACT_INTERVAL):
+    """Background task: compact the ledger every ``interval`` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with pool.acquire() as connection:
+                await compact_xp_events(connection)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("XP compaction failed")
@@ -290,4 +290,23 @@ class ChartService {
     }
     return [];
   }
+
+  /// Fetches every chart the user hasn't hidden in one request.
+  /// Each entry has `chart`, `measure`, `unit` and `points` ([date, value] pairs,
+  /// null when the chart has no series); with [progress] a 'Progress' entry per
+  /// exercise is included as well.
+  static Future<List<dynamic>> getDashboard(List<Map<String, String>> charts, {bool progress = true}) async {
+    final response = await http.post(
+      Uri.parse('$pythonBaseUrl/api/charts/dashboard'),
+      headers: await AuthService.getAuthHeaders(),
+      body: jsonEncode({
+        'charts': charts.map((c) => {'chart': c['name'], 'measure': c['measure'] ?? ''}).toList(),
+        'progress': progress,
+      }),
+    );
+    if (response.statusCode == 200) {
+      return json.decode(response.body)['charts'];
+    }
+    return [];
+  }
 }
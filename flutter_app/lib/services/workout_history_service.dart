@@ -44,8 +44,12 @@ class WorkoutHistoryService {
   }
 
   /// Get user's workout history
+  ///
+  /// Pass [before] as '<created_at>,<workout_id>' of the last workout on the
+  /// previous page to fetch the next (older) page.
   static Future<List<Map<String, dynamic>>> getWorkoutHistory({
     int? limit,
+    String? before,
   }) async {
     try {
       final headers = await AuthService.getAuthHeaders();
@@ -54,6 +58,9 @@ class WorkoutHistoryService {
       if (limit != null) {
         queryParams['limit'] = limit.toString();
       }
+      if (before != null) {
+        queryParams['before'] = before;
+      }
 
       final uri = Uri.parse('$baseUrl/workouts').replace(
         queryParameters: queryParams.isEmpty ? null : queryParams,
@@ -1,14 +1,25 @@
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Depends, Query, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional
 from pydantic import BaseModel
-from asyncio import ensure_future
+from contextlib import asynccontextmanager
 
 from database.exercise import ExerciseSelection
 from database.chart_data import CollectedData
+from database.login import close_pool, connection, init_pool
 from database.workout_save import WorkoutSave
 
-app = FastAPI(title="FitnessApp API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_pool()
+    try:
+        yield
+    finally:
+        close_pool()
+
+
+app = FastAPI(title="FitnessApp API", lifespan=lifespan)
 
 # Development CORS — allow emulator and local browsers
 app.add_middleware(
@@ -19,8 +30,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-svc = ExerciseSelection()
-workout_svc = WorkoutSave()
+
+def get_conn():
+    """One pooled connection per request, so concurrent requests don't share cursors"""
+    with connection() as conn:
+        yield conn
 
 
 class SetData(BaseModel):
@@ -45,6 +59,7 @@ def list_exercises(
     area: Optional[str] = None,
     type: Optional[str] = None,
     equipment: Optional[List[str]] = Query(None),
+    conn=Depends(get_conn),
 ):
     """List exercises. `equipment` may be repeated or provided as CSV by the client."""
     try:
@@ -58,16 +73,16 @@ def list_exercises(
                 else:
                     eq.append(item)
 
-        results = svc.exer_filter(name=name, area=area, type=type, equipment=eq)
+        results = ExerciseSelection(conn).exer_filter(name=name, area=area, type=type, equipment=eq)
         return results
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/exercises/{exercise_id}")
-def get_exercise(exercise_id: int):
+def get_exercise(exercise_id: int, conn=Depends(get_conn)):
     try:
-        results = svc.exer_filter()
+        results = ExerciseSelection(conn).exer_filter()
         for r in results:
             if r.get("id") == exercise_id:
                 return r
@@ -79,7 +94,7 @@ def get_exercise(exercise_id: int):
 
 
 @app.post("/api/workouts")
-def save_workout(body: SaveWorkoutRequest):
+def save_workout(body: SaveWorkoutRequest, conn=Depends(get_conn)):
     try:
         exercises = [
             {
@@ -89,32 +104,32 @@ def save_workout(body: SaveWorkoutRequest):
             }
             for ex in body.exercises
         ]
-        work_id = workout_svc.save_workout(exercises, work_name=body.work_name)
+        work_id = WorkoutSave(conn).save_workout(exercises, work_name=body.work_name)
         return {"work_id": work_id, "message": "Workout saved"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/workouts")
-def get_workouts():
+def get_workouts(conn=Depends(get_conn)):
     try:
-        return workout_svc.get_workouts()
+        return WorkoutSave(conn).get_workouts()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/workouts/{work_id}")
-def get_workout_logs(work_id: int):
+def get_workout_logs(work_id: int, conn=Depends(get_conn)):
     try:
-        return workout_svc.get_workout_logs(work_id)
+        return WorkoutSave(conn).get_workout_logs(work_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/charts/options")
-def get_chart_options(body_id: int):
+def get_chart_options(body_id: int, conn=Depends(get_conn)):
     try:
-        rows = CollectedData(body_id).find_user_done()
+        rows = CollectedData(body_id, conn).find_user_done()
 
         cardio = []
         strength = []
@@ -139,9 +154,9 @@ def get_chart_options(body_id: int):
 
 
 @app.get("/chart/weight/{body_id}")
-def chart_weight(body_id: int):
+def chart_weight(body_id: int, conn=Depends(get_conn)):
     try:
-        data = CollectedData(body_id).get_weight()
+        data = CollectedData(body_id, conn).get_weight()
         if not data:
             return []
         current, past = data
@@ -152,9 +167,9 @@ def chart_weight(body_id: int):
 
 
 @app.get("/chart/body-type/{body_id}")
-def chart_body_type(body_id: int):
+def chart_body_type(body_id: int, conn=Depends(get_conn)):
     try:
-        rows = CollectedData(body_id).find_body_type()
+        rows = CollectedData(body_id, conn).find_body_type()
         if not rows:
             return []
         # Convert list of dicts to list of [label, value], take top 4 and pad to 4
@@ -0,0 +1,83 @@
+"""Benchmark: chart throughput against connection pool size.
+
+Calls the chart handlers from ``--threads`` threads, the way FastAPI runs the
+sync ``def`` handlers on its threadpool, each request borrowing one pooled
+connection as ``get_conn`` does in the API. It repeats this for every pool size
+in ``--pool-sizes``. A pool of 1 behaves like the old single shared
+connection, so throughput should rise with the pool size until the database
+or the threads are saturated.
+
+    python benchmarks/bench_charts.py --requests 2000 --threads 32 --pool-sizes 1 2 4 8 16
+
+Uses the database configured in database/.env; ``--body-id`` defaults to
+the body with the most logged training.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+from database.login import close_pool, connection, init_pool
+
+
+def busiest_body_id():
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT body_id FROM training_body GROUP BY body_id ORDER BY COUNT(*) DESC LIMIT 1"
+        )
+        row = cur.fetchone()
+    if row is None:
+        sys.exit("No training logged; pass --body-id or seed the database first")
+    return row[0]
+
+
+def chart_request(body_id):
+    start = time.perf_counter()
+    with connection() as conn:
+        app.get_chart_options(body_id, conn=conn)
+        app.chart_body_type(body_id, conn=conn)
+        app.chart_weight(body_id, conn=conn)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_size(pool_size, body_id, requests, threads):
+    init_pool(minconn=pool_size, maxconn=pool_size)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        # Warm up every connection before timing
+        list(executor.map(chart_request, [body_id] * pool_size))
+        start = time.perf_counter()
+        latencies = sorted(executor.map(chart_request, [body_id] * requests))
+        elapsed = time.perf_counter() - start
+    return {
+        "pool_size": pool_size,
+        "rps": round(requests / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+    }
+
+
+def run(args):
+    body_id = args.body_id or busiest_body_id()
+    results = []
+    try:
+        for size in args.pool_sizes:
+            result = run_size(size, body_id, args.requests, args.threads)
+            result["speedup"] = round(result["rps"] / results[0]["rps"], 2) if results else 1.0
+            results.append(result)
+            print(" ".join(f"{key}={value}" for key, value in result.items()))
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32, help="concurrent requests, like the handler threadpool")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--body-id", type=int)
+    run(parser.parse_args())
@@ -0,0 +1,143 @@
+"""Benchmark: best-set-per-day chart query on a long training history.
+
+Builds a ``bench_train_name`` schema holding ``--users`` users with
+``--rows`` training sets each (1M by default), spread over ``--days`` days
+and 20 exercises, then times:
+
+    old      - the previous _get_train_name (max effort per timestamp
+               across the whole history, joined back through training_body)
+    no-index - CollectedData._get_train_name without its index
+    index    - the same after migration 0008's index is created
+
+reporting the median of ``--repeat`` runs for a strength and a cardio
+exercise.
+
+    python benchmarks/bench_train_name.py --rows 1000000 --repeat 5
+
+Uses the database configured in database/.env; the schema is dropped
+afterwards unless ``--keep`` is given.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psycopg2
+
+from database.chart_data import CollectedData
+from database.login import DB_SETTINGS
+
+SCHEMA = "bench_train_name"
+INDEX_SQL = (
+    Path(__file__).resolve().parents[3] / "backend" / "migrations" / "0008_training_best_set_index.sql"
+).read_text()
+
+SCHEMA_SQL = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+CREATE TABLE exercise (exer_id INT PRIMARY KEY, exer_name TEXT NOT NULL, exer_type TEXT NOT NULL);
+CREATE TABLE body_metrics (body_id INT PRIMARY KEY, user_id INT NOT NULL);
+CREATE TABLE training (
+    train_id INT PRIMARY KEY, user_id INT, train_data TIMESTAMP,
+    train_mins INT, train_reps INT, train_effort FLOAT NOT NULL
+);
+CREATE TABLE training_exercise (train_id INT NOT NULL, exer_id INT NOT NULL);
+CREATE TABLE training_body (train_id INT NOT NULL, body_id INT NOT NULL);
+
+INSERT INTO exercise
+SELECT g, 'exercise ' || g, CASE WHEN g %% 5 = 0 THEN 'cardio' ELSE 'strength' END
+FROM generate_series(1, 20) g;
+INSERT INTO body_metrics SELECT g, g FROM generate_series(1, %(users)s) g;
+
+INSERT INTO training
+SELECT g, 1 + g %% %(users)s,
+       date_trunc('day', NOW()) - (g / (%(users)s * %(per_day)s)) * INTERVAL '1 day'
+           + (17 + g %% 4) * INTERVAL '1 hour' + (g %% 60) * INTERVAL '1 minute',
+       10 + g %% 30, 5 + g %% 8, 20 + (g * 7919) %% 100
+FROM generate_series(1, %(total)s) g;
+INSERT INTO training_exercise SELECT train_id, 1 + (train_id / 7) %% 20 FROM training;
+INSERT INTO training_body SELECT train_id, user_id FROM training;
+
+CREATE INDEX ON training (user_id, train_data);
+CREATE INDEX ON training_exercise (train_id);
+CREATE INDEX ON training_exercise (exer_id, train_id);
+CREATE INDEX ON training_body (body_id, train_id);
+CREATE INDEX ON training_body (train_id);
+ANALYZE;
+"""
+
+OLD_SQL = """
+    SELECT t.train_data, t.train_mins, t.train_effort, t.train_reps, e.exer_type
+    FROM training t
+    JOIN training_body tb ON tb.train_id = t.train_id
+    JOIN training_exercise te ON te.train_id = t.train_id
+    JOIN exercise e ON e.exer_id = te.exer_id
+    JOIN (
+        SELECT t2.train_data AS train_data, MAX(t2.train_effort) AS max_effort
+        FROM training t2
+        JOIN training_body tb2 ON tb2.train_id = t2.train_id
+        WHERE tb2.body_id = %s
+        GROUP BY t2.train_data
+    ) m ON t.train_data = m.train_data AND t.train_effort = m.max_effort
+    WHERE tb.body_id = %s
+    AND e.exer_name = %s
+    ORDER BY t.train_data
+    LIMIT 7
+"""
+
+
+def old_query(cur, exercise):
+    cur.execute(OLD_SQL, (1, 1, exercise))
+    return cur.fetchall()
+
+
+def median_ms(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 2)
+
+
+def run(args):
+    conn = psycopg2.connect(**DB_SETTINGS, options=f"-c search_path={SCHEMA}")
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        start = time.perf_counter()
+        per_day = max(1, args.rows // args.days)
+        cur.execute(SCHEMA_SQL, {"users": args.users, "per_day": per_day, "total": args.users * args.rows})
+        print(f"seeded {args.users * args.rows:,} sets in {time.perf_counter() - start:.1f}s")
+
+        data = CollectedData(1, conn)
+        exercises = {"strength": "exercise 1", "cardio": "exercise 5"}
+        results = {name: {} for name in exercises}
+        for kind, exercise in exercises.items():
+            results[kind]["old"] = median_ms(lambda: old_query(cur, exercise), args.repeat)
+            results[kind]["no-index"] = median_ms(lambda: data._get_train_name(exercise), args.repeat)
+
+        cur.execute(INDEX_SQL)
+        cur.execute("ANALYZE training")
+        for kind, exercise in exercises.items():
+            results[kind]["index"] = median_ms(lambda: data._get_train_name(exercise), args.repeat)
+        for kind, timings in results.items():
+            print(f"{kind:<9} " + " ".join(f"{mode}={ms}ms" for mode, ms in timings.items()))
+    finally:
+        if not args.keep:
+            cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="training sets per user")
+    parser.add_argument("--days", type=int, default=1825, help="length of each user's history")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema")
+    run(parser.parse_args())
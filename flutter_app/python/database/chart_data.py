@@ -1,9 +1,6 @@
-from login import CONN
-
-
 class CollectedData:
 
-    def __init__(self,body_id, conn=CONN):
+    def __init__(self,body_id, conn):
         self.body_id = body_id
         self.conn = conn
         self.cur = self.conn.cursor()
@@ -11,8 +8,8 @@ class CollectedData:
     def _formatted_date(self,unform):
         return unform.strftime("%Y-%m-%d")
     
-    def _collect_rows(self,name):
-        rows = self._get_train_name(name)
+    def _collect_rows(self,name, days=7):
+        rows = self._get_train_name(name, days)
         if rows is None:
             return None
         formatted_rows = []
@@ -76,25 +73,25 @@ class CollectedData:
             for row in rows
         ]
         
-    def _get_train_name(self,name):
+    def _get_train_name(self, name, days=7, since=None):
+        """Best set (highest effort, then reps) of each of the last ``days`` days the
+        exercise was done, oldest first; ``since`` bounds how far back to look."""
         self.cur.execute("""
-            SELECT t.train_data, t.train_mins, t.train_effort, t.train_reps, e.exer_type
-            FROM training t
-            JOIN training_body tb ON tb.train_id = t.train_id
-            JOIN training_exercise te ON te.train_id = t.train_id
-            JOIN exercise e ON e.exer_id = te.exer_id 
-            JOIN (
-                SELECT t2.train_data AS train_data, MAX(t2.train_effort) AS max_effort
-                FROM training t2
-                JOIN training_body tb2 ON tb2.train_id = t2.train_id
-                WHERE tb2.body_id = %s
-                GROUP BY t2.train_data
-            ) m ON t.train_data = m.train_data AND t.train_effort = m.max_effort
-            WHERE tb.body_id = %s
-            AND e.exer_name = %s
-            ORDER BY t.train_data
-            LIMIT 7
-        """, (self.body_id, self.body_id, name))
+            SELECT day, train_mins, train_effort, train_reps, exer_type
+            FROM (
+                SELECT DISTINCT ON (t.train_data::date)
+                    t.train_data::date AS day, t.train_mins, t.train_effort, t.train_reps, e.exer_type
+                FROM training t
+                JOIN training_exercise te ON te.train_id = t.train_id
+                JOIN exercise e ON e.exer_id = te.exer_id
+                WHERE t.user_id = (SELECT user_id FROM body_metrics WHERE body_id = %s)
+                AND e.exer_name = %s
+                AND (%s::date IS NULL OR t.train_data::date >= %s::date)
+                ORDER BY t.train_data::date DESC, t.train_effort DESC, t.train_reps DESC
+                LIMIT %s
+            ) best
+            ORDER BY day
+        """, (self.body_id, name, since, since, days))
         return self.cur.fetchall()
 
     def _get_cadio_calories (self):
@@ -136,6 +133,8 @@ class CollectedData:
         date = self._formatted_date(rows[0][0])
         total = 0
         for row in rows:
+            if not row[1]:
+                continue  # no minutes logged, nothing burned (and no pace)
             speed = (row[2]*1000) / row[1]
             
             if speed <= row[4]:
@@ -164,10 +163,10 @@ class CollectedData:
         #out put the last 7 days 
             
     
-    def max_mins_weight (self,name):
+    def max_mins_weight (self,name, days=7):
         #1 = endurance
         #2 = distance/weight make code to know what one is needed km/kg
-        rows = self._collect_rows(name)
+        rows = self._collect_rows(name, days)
         measure, find = self._find_type(rows[0][4])
         final_collection = []
         for row in rows:
@@ -175,18 +174,20 @@ class CollectedData:
             final_collection.append (new_row)
         return final_collection, measure
 
-    def cardio_speed(self,name):
-        rows = self._collect_rows(name)
+    def cardio_speed(self,name, days=7):
+        rows = self._collect_rows(name, days)
         final_collection = []
         for row in rows:
+            if not row[1]:
+                continue
             speed = (row[2]*1000) / row[1]
             #meter per min
             new_row = [row[0],speed]
             final_collection.append (new_row)
         return final_collection  
      
-    def strength_total(self,name):
-        rows = self._collect_rows(name)
+    def strength_total(self,name, days=7):
+        rows = self._collect_rows(name, days)
         final_collection = []
         for row in rows:
             total = row[2] * row[3]
@@ -262,7 +263,8 @@ class CollectedData:
        
 
 if __name__ == "__main__":
-    CD = CollectedData(4)
+    from login import CONN
+    CD = CollectedData(4, CONN)
     print(CD.find_user_done())
     print(CD.cardio_speed("Jump Rope")) #average
     print(CD.strength_total("Bench Press")) #add rep and weight
@@ -1,9 +1,6 @@
-from .login import CONN
-
-
 class ExerciseSelection:
 
-    def __init__(self, conn=CONN):
+    def __init__(self, conn):
         self.conn = conn
         self.cur = self.conn.cursor()
 
@@ -87,6 +84,7 @@ WHERE ue.user_id = %s
         return [row[0] for row in self.cur.fetchall()]
         
 def test():    
+    from .login import CONN
     plan = ExerciseSelection(CONN)
     equipment = plan.auto_equipment(2)
     results = plan.exer_filter(equipment=equipment)
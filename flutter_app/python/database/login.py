@@ -1,11 +1,91 @@
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
 import psycopg2
 from dotenv import load_dotenv
-from pathlib import Path
+from psycopg2.pool import ThreadedConnectionPool
+
 load_dotenv(Path(__file__).parent / '.env')
-import os   
-          
-CONN = psycopg2.connect(
-    host= "localhost",   #just login stuff that is default 
-    dbname= "fitapp",    #name of database
-    user= "postgres",    #just login stuff that is default 
-    password= os.getenv("DB_PASS")) #your password you made in a .env file
\ No newline at end of file
+
+DB_SETTINGS = dict(
+    host="localhost",   #just login stuff that is default
+    dbname="fitapp",    #name of database
+    user="postgres",    #just login stuff that is default
+    password=os.getenv("DB_PASS"))  #your password you made in a .env file
+
+# Connections the chart API keeps open; FastAPI runs the sync handlers on up
+# to 40 threads, requests beyond the pool size wait for a free connection.
+# Named apart from backend/db.py's DB_POOL_* so one .env can size both.
+CHART_DB_POOL_MIN_SIZE = int(os.getenv("CHART_DB_POOL_MIN_SIZE", "1"))
+CHART_DB_POOL_MAX_SIZE = int(os.getenv("CHART_DB_POOL_MAX_SIZE", "10"))
+
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+def _open_pool(minconn, maxconn):
+    # Caller holds _pool_lock
+    global _pool, _slots
+    if _pool is not None:
+        _pool.closeall()
+    _pool = ThreadedConnectionPool(min(minconn, maxconn), maxconn, **DB_SETTINGS)
+    # ThreadedConnectionPool raises instead of blocking when exhausted
+    _slots = threading.BoundedSemaphore(maxconn)
+    return _pool
+
+
+def init_pool(minconn=CHART_DB_POOL_MIN_SIZE, maxconn=CHART_DB_POOL_MAX_SIZE):
+    """(Re)create the shared connection pool, closing the previous one"""
+    with _pool_lock:
+        return _open_pool(minconn, maxconn)
+
+
+def _current_pool():
+    """The pool and its slots, created by exactly one thread on first use"""
+    pool, slots = _pool, _slots
+    if pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _open_pool(CHART_DB_POOL_MIN_SIZE, CHART_DB_POOL_MAX_SIZE)
+            pool, slots = _pool, _slots
+    return pool, slots
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+@contextmanager
+def connection():
+    """Borrow a pooled connection for one unit of work.
+
+    Commits when the block succeeds and rolls back when it raises, so a
+    connection always goes back to the pool outside a transaction.
+    """
+    pool, slots = _current_pool()
+    with slots:
+        conn = pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn, close=bool(conn.closed))
+
+
+def __getattr__(name):
+    # The standalone scripts still share one connection, opened on first use
+    if name == "CONN":
+        global CONN
+        CONN = psycopg2.connect(**DB_SETTINGS)
+        return CONN
+    raise AttributeError(name)
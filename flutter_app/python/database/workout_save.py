@@ -1,11 +1,10 @@
 import json
-from .login import CONN
 from datetime import datetime
 
 
 class WorkoutSave:
 
-    def __init__(self, conn=CONN):
+    def __init__(self, conn):
         self.conn = conn
         self.cur = self.conn.cursor()
 